@@ -16,6 +16,7 @@ class LLMClient:
         history_size: int = 5,
         streaming: bool = False,
         system_prompt: Optional[str] = None,
+        stop: Optional[List[str]] = None,
     ):
         self.history_size = history_size
         self.chat_history = []
@@ -25,7 +26,8 @@ class LLMClient:
             model=model_name,
             temperature=temperature,
             num_predict=max_tokens,
-            streaming=streaming
+            streaming=streaming,
+            stop=stop
         )
 
     def _build_messages(self, user_input: str, system_override: Optional[str] = None):
@@ -3,6 +3,7 @@
 import os
 import re
 import json
+import orjson
 from datetime import datetime, date
 from typing import Dict, List, Any, Optional
 from neo4j import GraphDatabase
@@ -49,6 +50,8 @@ slm_client = LLMClient(
     history_size=0,
     streaming=False,
     system_prompt=None,
+    # Stop as soon as the model starts another alpaca section after its JSON answer
+    stop=["\n### "],
 )
 
 embeddings = EmbeddingHuggingFace()
@@ -239,37 +242,54 @@ alpaca_prompt = """### Instruction:
 ### Response:
 {}"""
 
-def extract_entities_relations(question: str) -> dict:
-    full_prompt = alpaca_prompt.format(
-        SYSTEM_PROMPT_NER,
-        question,
-        ""
-    )
+# Static part of the NER prompt, built once. Keeping it byte-identical across calls
+# also lets the model server reuse its KV cache for the shared prefix.
+_NER_PROMPT_PREFIX, _NER_PROMPT_SUFFIX = alpaca_prompt.format(
+    SYSTEM_PROMPT_NER,
+    "\0",
+    ""
+).split("\0")
 
-    raw_text = slm_client.chat_without_history(
-        user_input=full_prompt,
-        system_override=None
-    ).strip()
+def _build_ner_prompt(question: str) -> str:
+    return _NER_PROMPT_PREFIX + question + _NER_PROMPT_SUFFIX
 
+def _slice_json_object(text: str) -> str:
+    """
+    Return the first balanced {...} object in text, ignoring braces inside JSON strings,
+    so trailing tokens emitted after the object do not break parsing.
+    """
+    start_idx = text.find('{')
+    if start_idx == -1:
+        raise ValueError("No JSON object found in response")
+
+    depth = 0
+    in_string = False
+    escaped = False
+    for i in range(start_idx, len(text)):
+        c = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif c == '\\':
+                escaped = True
+            elif c == '"':
+                in_string = False
+        elif c == '"':
+            in_string = True
+        elif c == '{':
+            depth += 1
+        elif c == '}':
+            depth -= 1
+            if depth == 0:
+                return text[start_idx:i + 1]
+
+    raise ValueError("Unbalanced JSON object in response")
+
+def _parse_ner_response(raw_text: str) -> dict:
     try:
-        start_idx = raw_text.find('{')
-        if start_idx == -1:
-            raise ValueError("No JSON object found in response")
-        
-        brace_count = 0
-        end_idx = start_idx
-        for i in range(start_idx, len(raw_text)):
-            if raw_text[i] == '{':
-                brace_count += 1
-            elif raw_text[i] == '}':
-                brace_count -= 1
-                if brace_count == 0:
-                    end_idx = i + 1
-                    break
+        json_text = _slice_json_object(raw_text)
         
-        json_text = raw_text[start_idx:end_idx]
-        
-        data = json.loads(json_text)
+        data = orjson.loads(json_text)
         
         if not isinstance(data, dict):
             raise ValueError("Response is not a dictionary")
@@ -286,13 +306,21 @@ def extract_entities_relations(question: str) -> dict:
         
         return data
         
-    except (json.JSONDecodeError, ValueError) as e:
+    except (orjson.JSONDecodeError, ValueError) as e:
         logger.error(f"JSON parsing error: {e}")
         return {
             "entities": [],
             "intent_relation": ["UNKNOWN"]
         }
 
+def extract_entities_relations(question: str) -> dict:
+    raw_text = slm_client.chat_without_history(
+        user_input=_build_ner_prompt(question),
+        system_override=None
+    ).strip()
+
+    return _parse_ner_response(raw_text)
+
 def extract_entities_node(state: ChatState) -> ChatState:
     user_msg = state["user_input"]
     ner_response = extract_entities_relations(user_msg)
@@ -20,7 +20,7 @@ class SummaryHandler(xml.sax.ContentHandler):
         self._in_page = False
         self._in_revision = False
         self._title = ""
-        self._text_chunks = []
+        self._text_buf = []
         self.pages_processed = 0
         self.found_count = 0
 
@@ -29,16 +29,17 @@ class SummaryHandler(xml.sax.ContentHandler):
         if tag == "page":
             self._in_page = True
             self._title = ""
-            self._text_chunks = []
+            self._text_buf.clear()
         elif tag == "revision":
             self._in_revision = True
 
     def characters(self, content):
-        if self._in_page:
-            if self._current_tag == "title":
-                self._title += content
-            elif self._current_tag == "text":
-                self._text_chunks.append(content)
+        # <text> fragments are by far the most frequent callback, test for them first
+        if self._current_tag == "text":
+            if self._in_page:
+                self._text_buf.append(content)
+        elif self._in_page and self._current_tag == "title":
+            self._title += content
 
     def endElement(self, tag):
         if tag == "revision":
@@ -49,7 +50,7 @@ class SummaryHandler(xml.sax.ContentHandler):
                 log.info(f"Processed {self.pages_processed} pages... Found {self.found_count}/{len(self.target_titles)} summaries.")
             
             if self._title in self.target_titles:
-                full_text = "".join(self._text_chunks)
+                full_text = "".join(self._text_buf)
                 summary = self.extract_summary(full_text, self._title)
                 
                 if summary:
@@ -59,7 +60,7 @@ class SummaryHandler(xml.sax.ContentHandler):
             
             self._in_page = False
             self._title = ""
-            self._text_chunks = []
+            self._text_buf.clear()
         self._current_tag = ""
     
     def extract_summary(self, text: str, title: str) -> Optional[str]:
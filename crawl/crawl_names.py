@@ -3,8 +3,8 @@
 import re
 import os
 import requests
+import lxml.html
 
-from bs4 import BeautifulSoup
 from urllib.parse import unquote
 
 from utils.config import settings
@@ -21,16 +21,19 @@ exclusion_keywords = [
     "TP", "TP.", "Thành phố", "Ban Bí thư", "Bộ Chính trị"
 ]
 
+session = requests.Session()
+session.headers.update({
+    "User-Agent": settings.USER_AGENT,
+    "Accept-Encoding": "gzip, deflate"
+})
+
 def connect_url(url: str) -> requests.Response:
     """
     Connect to a URL and return the response object.
+    The body is kept as raw bytes (already gunzipped by requests) for lxml to decode.
     """
     try:
-        headers = {
-            "User-Agent": settings.USER_AGENT
-        }
-        response = requests.get(url, headers=headers)
-        response.encoding = "utf-8"
+        response = session.get(url)
         response.raise_for_status()
         return response
     except requests.RequestException as e:
@@ -40,6 +43,30 @@ def connect_url(url: str) -> requests.Response:
         log.error(f"Unexpected error: {e}")
         return None
 
+NAME_LINKS_XPATH = (
+    "//table[contains(@class,'wikitable') and not(ancestor::table[contains(@class,'wikitable')])]//tr/td[2]//a/@href"
+    " | //ol/li/a/@href"
+)
+
+def _clean_href_str(href: str) -> str | None:
+    """
+    Convert a Wikipedia href into a politician name, or None if it should be skipped.
+    """
+    name_href = unquote(href.replace("/wiki/", "").replace("_", " "))
+
+    if name_href.startswith("/w/index.php?title="):
+        match = re.search(r"/w/index\.php\?title=([^&]+)", name_href)
+        if match:
+            name_href = unquote(match.group(1)).replace("_", " ")
+
+    if name_href.startswith("#cite") or name_href.isdigit():
+        return None
+
+    if any(keyword in name_href for keyword in exclusion_keywords):
+        return None
+
+    return name_href
+
 def extract_names(term: str) -> list[str]:
     """
     Crawl List politicians from Wikipedia page for a given term (the table "Ủy viên chính thức Ban Chấp hành Trung ương").
@@ -52,153 +79,31 @@ def extract_names(term: str) -> list[str]:
         return []
 
     try:
-        soup = BeautifulSoup(response.text, "html.parser")
+        tree = lxml.html.fromstring(response.content)
     except Exception as e:
         log.error(f"Error parsing HTML: {e}")
         return []
 
     try:
-        tables = soup.find_all("table", class_="wikitable")
-        ordered_lists = soup.find_all("ol")
-        
-        log.info(f"Find {len(tables)} table wikitable and {len(ordered_lists)} ordered lists in {url}")
+        hrefs = tree.xpath(NAME_LINKS_XPATH)
+        log.info(f"Found {len(hrefs)} candidate links in {url}")
 
-        if not tables and not ordered_lists:
+        if not hrefs:
             log.warning(f"Not found tables or lists in {url}, return empty list")
             return []
-    
-        top_level_tables = []
-        for table in tables:
-            parent_table = table.find_parent("table", class_="wikitable")
-            if parent_table is None:
-                top_level_tables.append(table)
-        
-        log.info(f"Found {len(top_level_tables)} top-level tables and {len(ordered_lists)} ordered lists")
-
     except Exception as e:
         log.exception(f"Error finding tables/lists: {e}")
         return []
-    
+
     names = []
 
-    try:
-        for table in top_level_tables:
-            rows = table.find("tbody").find_all("tr", recursive=False) if table.find("tbody") else table.find_all("tr", recursive=False)
-            
-            log.info(f"Processing table with {len(rows)} direct rows")
-            
-            for row in rows:
-                cols = row.find_all("td", recursive=False)
-                
-                if len(cols) > 1:
-                    name_cell = cols[1]
-                    
-                    nested_table = name_cell.find("table", class_="wikitable")
-                    
-                    if nested_table:
-                        log.info(f"Found nested table in row, processing nested table")
-                        nested_rows = nested_table.find("tbody").find_all("tr", recursive=False) if nested_table.find("tbody") else nested_table.find_all("tr", recursive=False)
-                        
-                        for nested_row in nested_rows:
-                            nested_cols = nested_row.find_all("td", recursive=False)
-                            if len(nested_cols) > 1:
-                                nested_name_cell = nested_cols[1]
-                                nested_link = nested_name_cell.find("a")
-                                
-                                if nested_link:
-                                    try:
-                                        name_href = unquote(nested_link.get("href").replace("/wiki/", "").replace("_", " "))
-
-                                        if name_href.startswith("/w/index.php?title="):
-                                            match = re.search(r"/w/index\.php\?title=([^&]+)", name_href)
-                                            if match:
-                                                name_href = unquote(match.group(1)).replace("_", " ")
-
-                                        if name_href.startswith("#cite") or name_href.isdigit():
-                                            continue
-
-                                        if any(keyword in name_href for keyword in exclusion_keywords):
-                                            continue
-
-                                        names.append(name_href)
-
-                                    except Exception as e:
-                                        log.warning(f"Error extracting name from nested link {nested_link}: {e}")
-                    else:
-                        link = name_cell.find("a")
-
-                        if name_cell.find("br") or name_cell.find("p"):
-                            if link:
-                                try:
-                                    name_href = unquote(link.get("href").replace("/wiki/", "").replace("_", " "))
-
-                                    if name_href.startswith("/w/index.php?title="):
-                                        match = re.search(r"/w/index\.php\?title=([^&]+)", name_href)
-                                        if match:
-                                            name_href = unquote(match.group(1)).replace("_", " ")
-
-                                    if name_href.startswith("#cite") or name_href.isdigit():
-                                        continue
-
-                                    if any(keyword in name_href for keyword in exclusion_keywords):
-                                        continue
-
-                                    names.append(name_href)
-
-                                except Exception as e:
-                                    log.warning(f"Error extracting name from link {link}: {e}")
-
-                        elif not name_cell.find("br") and not name_cell.find("p") and link and len(name_cell.find_all("a")) == 1:
-                            if link:
-                                try:
-                                    name_href = unquote(link.get("href").replace("/wiki/", "").replace("_", " "))
-
-                                    if name_href.startswith("/w/index.php?title="):
-                                        match = re.search(r"/w/index\.php\?title=([^&]+)", name_href)
-                                        if match:
-                                            name_href = unquote(match.group(1)).replace("_", " ")
-
-                                    if name_href.startswith("#cite") or name_href.isdigit():
-                                        continue
-
-                                    if any(keyword in name_href for keyword in exclusion_keywords):
-                                        continue
-
-                                    names.append(name_href)
-
-                                except Exception as e:
-                                    log.warning(f"Error extracting name from link {link}: {e}")
-        
-        for ol in ordered_lists:
-            list_items = ol.find_all("li", recursive=False)
-            log.info(f"Processing ordered list with {len(list_items)} items")
-            
-            for li in list_items:
-                link = li.find("a")
-                if link:
-                    try:
-                        name_href = unquote(link.get("href").replace("/wiki/", "").replace("_", " "))
-
-                        if name_href.startswith("/w/index.php?title="):
-                            match = re.search(r"/w/index\.php\?title=([^&]+)", name_href)
-                            if match:
-                                name_href = unquote(match.group(1)).replace("_", " ")
-
-                        if name_href.startswith("#cite") or name_href.isdigit():
-                            continue
-
-                        if any(keyword in name_href for keyword in exclusion_keywords):
-                            continue
-
-                        names.append(name_href)
-
-                    except Exception as e:
-                        log.warning(f"Error extracting name from list link {link}: {e}")
-        
-        log.info(f"Successfully extracted {len(names)} politician names from {len(top_level_tables)} table(s) and {len(ordered_lists)} list(s)")
-    except Exception as e:
-        log.exception(f"Error processing table rows: {e}")
-        return []
+    for href in hrefs:
+        try:
+            name_href = _clean_href_str(href)
+            if name_href:
+                names.append(name_href)
+        except Exception as e:
+            log.warning(f"Error extracting name from link {href}: {e}")
 
     log.info(f"Total politician names found: {len(names)}")
     return names
@@ -235,9 +140,9 @@ def write_names_to_file(names, filename):
     log.info(f"Write {len(names)} names to file {filename}")
 
     try:
-        with open(filename, "w", encoding="utf-8") as f:
-            for name_href in names:
-                f.write(f"{name_href}\n")
+        with open(filename, "wb") as f:
+            f.write("\n".join(names).encode("utf-8"))
+            f.write(b"\n")
     except Exception as e:
         log.error(f"Error writing names to file {filename}: {e}")
 
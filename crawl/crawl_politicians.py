@@ -1,11 +1,15 @@
 # ./crawl/get_politicians.py
 
+import os
 import re
-import json
-import xml.sax
+import orjson
 import wikitextparser as wtp
 
-from typing import Dict, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from lxml import etree
+
+from typing import Dict, Iterator, Optional, Tuple
 
 from .alias import COMPREHENSIVE_MAPPING
 from utils.queue_based_async_logger import get_async_logger
@@ -14,183 +18,169 @@ from utils.config import settings
 
 log = get_async_logger("crawl_politicians", log_file="logs/crawl/crawl_politicians.log")
 
-class PoliticianHandler(xml.sax.ContentHandler):
-    """
-    SAX Handler to extract politician infoboxes from Wikipedia XML dump.
-    """
-    
-    def __init__(self):
-        super().__init__()
-        self.all_politicians_data = []
-        self._current_tag = ""
-        self._in_page = False
-        self._in_revision = False
-        self._title = ""
-        self._text_chunks = []
-        self._page_id = ""
-        self.pages_processed = 0
-
-    def startElement(self, tag, attributes):
-        self._current_tag = tag
-
-        if tag == "page":
-            self._in_page = True
-            self._title = ""
-            self._text_chunks = []
-            self._page_id = ""
-        elif tag == "revision":
-            self._in_revision = True
-
-    def characters(self, content):
-        if not self._in_revision and self._current_tag == "id" and self._in_page:
-            self._page_id += content.strip()
-        elif self._in_page:
-            if self._current_tag == "title":
-                self._title += content
-            elif self._current_tag == "text":
-                self._text_chunks.append(content)
-
-    def endElement(self, tag):
-        if tag == "revision":
-            self._in_revision = False
-        elif tag == "page":
-            self.pages_processed += 1
-            if self.pages_processed % 10000 == 0:
-                log.info(f"Processed {self.pages_processed} pages... Found {len(self.all_politicians_data)} politicians.")
-            
-            full_text = "".join(self._text_chunks)
-            
-            infobox_raw, template_name = self.extract_infobox(full_text)
-            
-            # if template is politician
-            if template_name not in ["NOT_FOUND", "ERROR"]:
-                
-                # Normalize infobox
-                infobox_normalized = self.normalize_infobox(infobox_raw)
-                
-                data_entry = {
-                    "title": self._title,
-                    "id": self._page_id,
-                    "template": template_name,
-                    "infobox": infobox_normalized 
-                }
-                
-                self.all_politicians_data.append(data_entry)
-            
-            # Reset
-            self._in_page = False
-            self._title = ""
-            self._text_chunks = []
-            self._page_id = ""
-
-        self._current_tag = ""
-    
-    def extract_infobox(self, text: str) -> Tuple[Dict, str]:
-        try:
-            parsed = wtp.parse(text)
-            infobox_data = {}
-
-            priority_templates = [name for name in PRIORITY_TEMPLATES]
-
-            infobox_template = None
-            template_name = None
-
-            for priority_name in priority_templates:
-                for tpl in parsed.templates:
-                    tpl_name = tpl.name.strip()
-                    if tpl_name == priority_name:
+_PRIORITY_TEMPLATES = tuple(dict.fromkeys(name.lower() for name in PRIORITY_TEMPLATES))
+_INFOBOX_EXCLUDE_KEYWORDS = ("succession", "section", "collapsed", "/", "thứ tự")
+
+_KEY_RE = re.compile(r'^(.+?)[\s_]*(\d+)$')
+_KEY_TRANS = str.maketrans({' ': '_', '-': '_'})
+
+PAGE_CHUNKSIZE = 64
+
+def extract_infobox(text: str) -> Tuple[Dict, str]:
+    try:
+        parsed = wtp.parse(text)
+        infobox_data = {}
+
+        tpls_by_name = {}
+        for tpl in parsed.templates:
+            tpls_by_name.setdefault(tpl.name.strip().lower(), tpl)
+
+        infobox_template = None
+        template_name = None
+
+        for priority_name in _PRIORITY_TEMPLATES:
+            if priority_name in tpls_by_name:
+                infobox_template = tpls_by_name[priority_name]
+                template_name = infobox_template.name.strip()
+                break
+
+        if not infobox_template:
+            for name_lower, tpl in tpls_by_name.items():
+                if "infobox" in name_lower or "thông tin" in name_lower:
+                    if not any(ex in name_lower for ex in _INFOBOX_EXCLUDE_KEYWORDS):
                         infobox_template = tpl
                         template_name = tpl.name.strip()
                         break
-                if infobox_template:
-                    break
-
-            if not infobox_template:
-                for tpl in parsed.templates:
-                    name_lower = tpl.name.strip().lower()
-                    if "infobox" in name_lower or "thông tin" in name_lower:
-                        exclude_keywords = ["succession", "section", "collapsed", "/", "thứ tự"]
-                        if not any(ex in name_lower for ex in exclude_keywords):
-                            infobox_template = tpl
-                            template_name = tpl.name.strip()
-                            break
-
-            if infobox_template:
-                for arg in infobox_template.arguments:
-                    key = arg.name.strip()
-                    value = arg.value.strip()
-                    if key and value:
-                        infobox_data[key] = value
-            else:
-                template_name = "NOT_FOUND"
-            return infobox_data, template_name
-        
-        except Exception as e:
-            log.error(f"Error processing wikitext: {e}")
-            return {}, "ERROR"
-
-    def normalize_key(self, key: str) -> str:
-        match = re.match(r'^(.+?)[\s_]*(\d+)$', key)
-
-        if match:
-            base_key = match.group(1).strip()
-            number = match.group(2)
+
+        if infobox_template:
+            for arg in infobox_template.arguments:
+                key = arg.name.strip()
+                value = arg.value.strip()
+                if key and value:
+                    infobox_data[key] = value
         else:
-            base_key = key.strip()
-            number = ""
+            template_name = "NOT_FOUND"
+        return infobox_data, template_name
 
-        base_key_lower = base_key.lower()
+    except Exception as e:
+        log.error(f"Error processing wikitext: {e}")
+        return {}, "ERROR"
 
-        if base_key_lower in COMPREHENSIVE_MAPPING:
-            normalized_base = COMPREHENSIVE_MAPPING[base_key_lower]
-        else:
-            normalized_base = base_key_lower.replace(' ', '_').replace('-', '_')
+def normalize_key(key: str) -> str:
+    match = _KEY_RE.match(key)
+
+    if match:
+        base_key = match.group(1).strip()
+        number = match.group(2)
+    else:
+        base_key = key.strip()
+        number = ""
+
+    base_key_lower = base_key.lower()
+
+    normalized_base = COMPREHENSIVE_MAPPING.get(base_key_lower)
+    if normalized_base is None:
+        normalized_base = base_key_lower.translate(_KEY_TRANS)
+
+    if number:
+        return f"{normalized_base}{number}"
+    else:
+        return normalized_base
+
+def normalize_infobox(infobox: Dict) -> Dict:
+    normalized = {}
+    for key, value in infobox.items():
+        normalized_key = normalize_key(key)
+
+        value = str(value).strip()
 
-        if number:
-            return f"{normalized_base}{number}"
+        if normalized_key in normalized:
+            existing_value = normalized[normalized_key]
+            if value not in existing_value:
+                normalized[normalized_key] = f"{existing_value}; {value}"
         else:
-            return normalized_base
+            normalized[normalized_key] = value
+    return normalized
 
-    def normalize_infobox(self, infobox: Dict) -> Dict:
-        normalized = {}
-        for key, value in infobox.items():
-            normalized_key = self.normalize_key(key)
+def process_page(page: Tuple[str, str, str]) -> Optional[Dict]:
+    """
+    Worker function: parse one page's wikitext and return its data entry, or None if it has no politician infobox.
+    """
+    title, page_id, text = page
+
+    infobox_raw, template_name = extract_infobox(text)
+
+    # if template is politician
+    if template_name in ["NOT_FOUND", "ERROR"]:
+        return None
 
-            value = str(value).strip()
+    # Normalize infobox
+    infobox_normalized = normalize_infobox(infobox_raw)
 
-            if normalized_key in normalized:
-                existing_value = normalized[normalized_key]
-                if value not in existing_value:
-                    normalized[normalized_key] = f"{existing_value}; {value}"
-            else:
-                normalized[normalized_key] = value
-        return normalized
+    return {
+        "title": title,
+        "id": page_id,
+        "template": template_name,
+        "infobox": infobox_normalized
+    }
 
-def build_politician(xml_file: str, output_db_file: str):
+def iter_pages(xml_file: str) -> Iterator[Tuple[str, str, str]]:
     """
-    Run the politician extraction process from the given XML file
+    Stream (title, id, text) tuples from the XML dump, freeing each <page> once read.
+    """
+    for _, elem in etree.iterparse(xml_file, events=("end",), tag="{*}page"):
+        title = elem.findtext("{*}title") or ""
+        page_id = (elem.findtext("{*}id") or "").strip()
+        text = elem.findtext("{*}revision/{*}text") or ""
+
+        # Free the processed page and its already-seen siblings
+        elem.clear()
+        while elem.getprevious() is not None:
+            del elem.getparent()[0]
+
+        yield title, page_id, text
+
+def build_politician(xml_file: str, output_db_file: str, max_workers: Optional[int] = None):
+    """
+    Run the politician extraction process from the given XML file.
+    Pages are streamed in the main process and parsed by a pool of worker processes.
     """
     log.info(f"Input XML: {xml_file}")
-    
-    handler = PoliticianHandler()
-    
-    parser = xml.sax.make_parser()
-    parser.setFeature(xml.sax.handler.feature_namespaces, 0)
-    parser.setContentHandler(handler)
-    
+
+    max_workers = max_workers or os.cpu_count() or 1
+    batch_size = max_workers * PAGE_CHUNKSIZE * 4
+
+    all_politicians_data = []
+    pages_processed = 0
+
     try:
-        parser.parse(xml_file)
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            pages = iter_pages(xml_file)
+            # Submit bounded batches so the dump is never materialized in memory
+            while batch := list(islice(pages, batch_size)):
+                for data_entry in executor.map(process_page, batch, chunksize=PAGE_CHUNKSIZE):
+                    if data_entry is not None:
+                        all_politicians_data.append(data_entry)
+
+                pages_processed += len(batch)
+                log.info(f"Processed {pages_processed} pages... Found {len(all_politicians_data)} politicians.")
     except Exception as e:
         log.error(f"Error parsing file: {e}")
-    
+
     log.info(f"COMPLETED")
-    log.info(f"Total pages processed: {handler.pages_processed}")
-    log.info(f"Total politicians found: {len(handler.all_politicians_data)}")
-    
+    log.info(f"Total pages processed: {pages_processed}")
+    log.info(f"Total politicians found: {len(all_politicians_data)}")
+
     log.info(f"Saving database to: {output_db_file}")
-    with open(output_db_file, 'w', encoding='utf-8') as f:
-        json.dump(handler.all_politicians_data, f, ensure_ascii=False, indent=2)
-    
+    with open(output_db_file, 'wb') as f:
+        # Write the array record by record to avoid building one giant string
+        f.write(b"[")
+        for i, data_entry in enumerate(all_politicians_data):
+            if i:
+                f.write(b",\n")
+            f.write(orjson.dumps(data_entry))
+        f.write(b"]\n")
+
     log.info(f"Successfully saved!")
 
 if __name__ == "__main__":
@@ -3,28 +3,216 @@
 import os
 import json
 import time
+import random
+import ijson
+import orjson
+import asyncio
+import threading
 import google.generativeai as genai
 
+from google.api_core import exceptions as google_exceptions
+
 from tqdm import tqdm
-from typing import Dict, List, Set
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+from datetime import datetime, timezone
 from neo4j import GraphDatabase
+from neo4j.exceptions import Neo4jError
 from dotenv import load_dotenv
 load_dotenv()
 
 from utils.config import settings
 from utils._logger import get_logger
 from utils.api_key_rotator import get_api_key_rotator
+from enrichment.llm_cache import LLMCache, make_cache_key
 
 logger = get_logger("enrichment.enrich_neo4j", log_file="logs/enrichment/enrich_neo4j.log")
 
 with open('enrichment/schema.json', 'r', encoding='utf-8') as f:
     ENRICHMENT_SCHEMA = json.load(f)
 
+# Bump whenever the prompt or schema changes so cached responses are invalidated
+PROMPT_VERSION = "v2"
+
+PROMPT_TEMPLATE = """
+Bạn là chuyên gia phân tích tiểu sử chính trị gia. Hãy trích xuất CHÍNH XÁC thông tin từ văn bản sau:
+
+**Chính trị gia**: {politician_name} (ID: {politician_id})
+
+**Văn bản tiểu sử**:
+{summary}
+
+**YÊU CẦU**:
+1. **Positions**: Trích xuất TẤT CẢ các chức vụ được nhắc đến. Ghép chức danh + tổ chức (VD: "Bí thư Tỉnh ủy Hà Nội").
+   - Phát hiện status: "bị cách chức/miễn nhiệm" nếu có từ "bị cách chức"/"miễn nhiệm"/"bãi bỏ"/"thôi việc"/"từ chức"/"nghỉ việc".
+   - Trích xuất lý do vào trường "reason" nếu nếu có kỷ luật, miễn nhiệm, bị cách chức, bãi bỏ, thôi việc, từ chức, nghỉ việc.
+   
+2. **Locations**: Chỉ trích xuất địa danh (tỉnh/thành phố) liên quan đến:
+   - Nơi sinh (BORN_AT)
+   - Nơi mất (DIED_AT)
+
+3. **AlmaMater**: Trích xuất tên các trường học, học viện, đại học nơi chính trị gia theo học.
+
+4. **MilitaryCareers**: Trích xuất đơn vị quân đội/công an phục vụ với khoảng thời gian (nếu có).
+
+5. **MilitaryRanks**: Trích xuất cấp bậc quân đội/công an (VD: Đại tướng, Trung tướng, Thiếu tướng, Đại tá...).
+
+6. **Awards**: Chỉ trích xuất các huân chương, huy chương, danh hiệu CHÍNH THỨC.
+
+7. **Campaigns**: Các chiến dịch quân sự đã tham chiến.
+
+8. **AcademicTitles**: Học hàm, học vị (VD: Tiến sĩ, Phó giáo sư, Giáo sư, Thạc sĩ...).
+
+9. **SuccessionRelations**: Quan hệ kế nhiệm/tiền nhiệm với chính trị gia KHÁC (phải có tên người và chức vụ liên quan).
+
+**LƯU Ý**: Chỉ trích xuất thông tin CÓ TRONG văn bản. KHÔNG bịa đặt.
+"""
+
+# Node labels and (relationship type, target label) pairs written by the enrichment
+ENRICHMENT_NODE_LABELS = [
+    "Position", "Location", "AlmaMater", "MilitaryCareer",
+    "MilitaryRank", "Award", "Campaigns", "AcademicTitle"
+]
+ENRICHMENT_EDGE_TYPES = [
+    ("SERVED_AS", "Position"),
+    ("BORN_AT", "Location"),
+    ("DIED_AT", "Location"),
+    ("ALUMNUS_OF", "AlmaMater"),
+    ("SERVED_IN", "MilitaryCareer"),
+    ("HAS_RANK", "MilitaryRank"),
+    ("AWARDED", "Award"),
+    ("FOUGHT_IN", "Campaigns"),
+    ("HAS_ACADEMIC_TITLE", "AcademicTitle")
+]
+
+def _build_enrichment_node_query() -> str:
+    """
+    One query that creates the new entity nodes of a politician, each label as an UNWIND
+    inside its own CALL subquery so an empty list does not cut the query short. Nodes are
+    merged on name_lc, which is unique per label (see ensure_schema), so two writers
+    creating the same entity end up sharing one node; the [name_lc, id] pairs actually
+    stored are returned per label. Unchanged nodes are not rewritten on reruns.
+    """
+    clauses = ["MATCH (p:Politician {id: $pol_id})"]
+    for label in ENRICHMENT_NODE_LABELS:
+        clauses.append(f"""CALL {{
+    UNWIND $nodes.{label} AS row
+    MERGE (n:{label} {{name_lc: row.props.name_lc}})
+    ON CREATE SET n += row.props, n.id = row.id, n.created_at = $ts
+    ON MATCH SET n.last_updated = CASE WHEN n.name = row.props.name THEN n.last_updated ELSE $ts END
+    RETURN collect([n.name_lc, n.id]) AS {label}_ids
+}}""")
+    clauses.append("RETURN {" + ", ".join(f"{label}: {label}_ids" for label in ENRICHMENT_NODE_LABELS) + "} AS ids")
+    return "\n".join(clauses)
+
+def _build_enrichment_edge_query() -> str:
+    """
+    One query that writes every edge of a politician, one CALL subquery per edge type.
+    Timestamps come in as $ts.
+    """
+    clauses = ["MATCH (p:Politician {id: $pol_id})"]
+    for edge_type, label in ENRICHMENT_EDGE_TYPES:
+        clauses.append(f"""CALL {{
+    WITH p
+    UNWIND $edges.{edge_type} AS row
+    MATCH (t:{label} {{id: row.to}})
+    MERGE (p)-[r:{edge_type}]->(t)
+    ON CREATE SET r += row.props, r.created_at = $ts
+    RETURN count(r) AS {edge_type}_edges
+}}""")
+    clauses.append("RETURN " + " + ".join(f"{edge_type}_edges" for edge_type, _ in ENRICHMENT_EDGE_TYPES) + " AS edges_added")
+    return "\n".join(clauses)
+
+ENRICHMENT_NODE_QUERY = _build_enrichment_node_query()
+ENRICHMENT_EDGE_QUERY = _build_enrichment_edge_query()
+
+# Ids already taken under each label by a politician's id prefix ($prefixes.<label>, null to skip)
+TAKEN_IDS_QUERY = "\nUNION ALL\n".join(
+    f"MATCH (n:{label}) WHERE n.id STARTS WITH $prefixes.{label} RETURN '{label}' AS label, n.id AS id"
+    for label in ENRICHMENT_NODE_LABELS
+)
+
+EDGE_TARGET_LABELS = dict(ENRICHMENT_EDGE_TYPES)
+
+def _to_int(value) -> Optional[int]:
+    """
+    int(value) for ints and digit strings (e.g. LLM-extracted years), None otherwise.
+    """
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str):
+        value = value.strip()
+        if value.lstrip("-").isdecimal():
+            return int(value)
+    return None
+
+def _position_edge_props(position: Dict) -> Dict:
+    return {k: position[k] for k in ("term_start", "term_end", "status", "reason") if position.get(k)}
+
+def _military_edge_props(military: Dict) -> Dict:
+    year_start = _to_int(military.get("year_start"))
+    year_end = _to_int(military.get("year_end"))
+    return {k: v for k, v in (("year_start", year_start), ("year_end", year_end)) if v is not None}
+
+def _year_node_props(item: Dict) -> Dict:
+    return {"year": item["year"]} if item.get("year") else {}
+
+QUOTA_ERRORS = ("quota", "rate limit", "429", "resource_exhausted", "too many requests")
+# Retried by exception type: message substrings such as "500" or "connection" also match
+# permanent failures (e.g. a rejected API key)
+TRANSIENT_ERRORS = (
+    google_exceptions.InternalServerError,
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.DeadlineExceeded,
+    asyncio.TimeoutError,
+    ConnectionError
+)
+
+SUCCESSION_REL_TYPES = ("SUCCEEDED", "PRECEDED")
+
+# Labels and relationship types cannot be parameters, so every variant is built once here
+# and the same query text is reused, letting the server's plan cache hit
+NODES_BY_NAME_QUERIES = {
+    label: f"""
+    MATCH (n:{label}) WHERE n.name_lc IN $names
+    RETURN n.name_lc AS name, n.id AS id
+    """
+    for label in ENRICHMENT_NODE_LABELS
+}
+
+SUCCESSION_WRITE_QUERIES = {
+    rel_type: f"""
+    UNWIND $rels AS r
+    MATCH (a:Politician {{id: r.from}})
+    MATCH (b:Politician {{id: r.to}})
+    MERGE (a)-[e:{rel_type}]->(b)
+    ON CREATE SET e.position_id = r.position_id, e.context = r.context, e.source = 'llm_enrichment', e.type = $rel_type
+    RETURN count(e) AS edges
+    """
+    for rel_type in SUCCESSION_REL_TYPES
+}
+
+BATCH_TERMINAL_STATES = {
+    "JOB_STATE_SUCCEEDED", "JOB_STATE_FAILED", "JOB_STATE_CANCELLED", "JOB_STATE_EXPIRED"
+}
+
 
 class Neo4jEnrichment:
     
-    def __init__(self):
+    # (extracted key, node label, edge type, node props fn, edge props fn, extra detailed-log fields);
+    # edge type None means the per-item "relation" field (BORN_AT / DIED_AT) picks it
+    CATEGORIES = [
+        ("positions", "Position", "SERVED_AS", None, _position_edge_props, ("organization",)),
+        ("locations", "Location", None, None, None, ()),
+        ("alma_mater", "AlmaMater", "ALUMNUS_OF", None, None, ()),
+        ("military_careers", "MilitaryCareer", "SERVED_IN", None, _military_edge_props, ("year_start", "year_end")),
+        ("military_ranks", "MilitaryRank", "HAS_RANK", None, None, ()),
+        ("awards", "Award", "AWARDED", _year_node_props, None, ("year",)),
+        ("campaigns", "Campaigns", "FOUGHT_IN", _year_node_props, None, ("year",)),
+        ("academic_titles", "AcademicTitle", "HAS_ACADEMIC_TITLE", None, None, ()),
+    ]
+    
+    def __init__(self, use_cache: bool = True):
         self.api_rotator = get_api_key_rotator()
         logger.info(f"Using API key: {self.api_rotator.get_current_key_name()}")
         
@@ -32,17 +220,20 @@ class Neo4jEnrichment:
             settings.NEO4J_URI,
             auth=(settings.NEO4J_USER, settings.NEO4J_PASSWORD)
         )
-        self.model = genai.GenerativeModel(
-            model_name="gemini-2.5-flash-lite",
-            generation_config={
-                "response_mime_type": "application/json",
-                "response_schema": ENRICHMENT_SCHEMA,
-                "temperature": 0.1
-            }
-        )
+        self.ensure_schema()
+        # (label, lower(name)) -> node id, so repeated entities skip the Neo4j lookup
+        self.node_cache: Dict[Tuple[str, str], str] = {}
+        self.warm_node_cache()
+        self.model = self._create_model()
+        # Minimum spacing between request starts; requests themselves may overlap
         self.request_interval = 4.0
+        # Attempts per summary on quota, transient and malformed-JSON errors
+        self.max_retries = 5
+        self.max_retry_wait = 30.0
         self.last_request_time = 0
-        self.enrichment_log = []
+        self._rate_lock = None
+        self._semaphore = None
+        self.cache = LLMCache() if use_cache else None
         self.stats = {
             "processed": 0,
             "positions_added": 0,
@@ -56,18 +247,15 @@ class Neo4jEnrichment:
             "edges_added": 0,
             "errors": 0
         }
-        # Detailed logs: track for each category
-        self.detailed_logs = {
-            "positions": [],
-            "locations": [],
-            "alma_mater": [],
-            "military_careers": [],
-            "military_ranks": [],
-            "awards": [],
-            "campaigns": [],
-            "academic_titles": [],
-            "edges": []
-        }
+        # Detailed logs: one NDJSON record per enriched politician, flushed as we go
+        self.log_timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        os.makedirs("enrichment/result", exist_ok=True)
+        self.log_file = f"enrichment/result/detailed_enrichment_{self.log_timestamp}.ndjson"
+        self.log_fp = open(self.log_file, "ab")
+        # Guards stats, node cache and log file across writer threads
+        self._record_lock = threading.Lock()
+        # (from_id, person_name, rel_type, position, context), resolved after all politicians are written
+        self.pending_succession: List[Tuple[str, str, str, str, str]] = []
         # ID counters for generating unique IDs
         self.id_counters = {
             "Position": {},
@@ -94,506 +282,370 @@ class Neo4jEnrichment:
     def close(self):
         if self.driver:
             self.driver.close()
+        if self.log_fp:
+            self.log_fp.close()
+        if self.cache:
+            self.cache.close()
+
+    def ensure_schema(self):
+        """
+        Unique constraints on id and an index on the lowercased name (name_lc) for every
+        label touched by the enrichment, so MERGE and name lookups hit an index. On the
+        enrichment labels name_lc is unique as well, since new entities are merged on it.
+        """
+        with self.driver.session(database=settings.NEO4J_DATABASE) as session:
+            for label in ["Politician"] + ENRICHMENT_NODE_LABELS:
+                try:
+                    session.run(f"CREATE CONSTRAINT IF NOT EXISTS FOR (n:{label}) REQUIRE n.id IS UNIQUE").consume()
+                except Neo4jError as e:
+                    logger.warning(f"Could not create id constraint for {label}: {e}")
+                # Backfill nodes created before name_lc existed (e.g. by the graph import)
+                session.run(f"""
+                MATCH (n:{label}) WHERE n.name_lc IS NULL AND n.name IS NOT NULL
+                SET n.name_lc = toLower(n.name)
+                """).consume()
+                if label in ENRICHMENT_NODE_LABELS:
+                    try:
+                        session.run(f"CREATE CONSTRAINT IF NOT EXISTS FOR (n:{label}) REQUIRE n.name_lc IS UNIQUE").consume()
+                        continue
+                    except Neo4jError as e:
+                        logger.warning(f"Could not create name_lc constraint for {label}, "
+                                       f"concurrent writers may duplicate its nodes: {e}")
+                session.run(f"CREATE INDEX IF NOT EXISTS FOR (n:{label}) ON (n.name_lc)").consume()
     
-    def generate_node_id(self, label: str, politician_id: str, index: int) -> str:
+    def warm_node_cache(self):
+        query = """
+        MATCH (n) WHERE n.name_lc IS NOT NULL
+        UNWIND [label IN labels(n) WHERE label IN $labels] AS label
+        RETURN label, n.name_lc AS name, n.id AS id
         """
-        Generate node ID theo format: prefix + politician_base_id + _index
-        VD: pos19498354_001, loc436788_001, awa436788_002
+        with self.driver.session(database=settings.NEO4J_DATABASE) as session:
+            for record in session.run(query, labels=ENRICHMENT_NODE_LABELS):
+                self.node_cache[(record["label"], record["name"])] = record["id"]
+        logger.info(f"Warmed node cache with {len(self.node_cache)} entries")
+    
+    def _create_model(self):
+        return genai.GenerativeModel(
+            model_name="gemini-2.5-flash-lite",
+            generation_config={
+                "response_mime_type": "application/json",
+                "response_schema": ENRICHMENT_SCHEMA,
+                "temperature": 0.1
+            }
+        )
+
+    def _count_error(self):
+        # Errors are counted from the event loop and from writer threads alike
+        with self._record_lock:
+            self.stats["errors"] += 1
+    
+    async def _wait_for_rate_limit(self):
+        """
+        Space out request starts by request_interval without blocking the event loop.
+        """
+        async with self._rate_lock:
+            wait_time = self.last_request_time + self.request_interval - time.monotonic()
+            if wait_time > 0:
+                await asyncio.sleep(wait_time)
+            self.last_request_time = time.monotonic()
+    
+    def node_id_prefix(self, label: str, politician_id: str) -> str:
+        """
+        Prefix shared by every node ID of a label generated for a politician, e.g. pos19498354_
         """
         prefix = self.id_prefixes.get(label, "unk")
         # Extract số từ politician_id (pol19498354 -> 19498354)
         pol_base_id = politician_id.replace("pol", "")
-        return f"{prefix}{pol_base_id}_{index:03d}"
+        return f"{prefix}{pol_base_id}_"
     
-    def extract_from_summary(self, summary: str, politician_name: str, politician_id: str) -> Dict:
-        summary_escaped = summary.replace('"', '\\"').replace('\n', ' ')
-        
-        prompt = f"""
-Bạn là chuyên gia phân tích tiểu sử chính trị gia. Hãy trích xuất CHÍNH XÁC thông tin từ văn bản sau:
-
-**Chính trị gia**: {politician_name} (ID: {politician_id})
-
-**Văn bản tiểu sử**:
-{summary_escaped}
-
-**YÊU CẦU**:
-1. **Positions**: Trích xuất TẤT CẢ các chức vụ được nhắc đến. Ghép chức danh + tổ chức (VD: "Bí thư Tỉnh ủy Hà Nội").
-   - Phát hiện status: "bị cách chức/miễn nhiệm" nếu có từ "bị cách chức"/"miễn nhiệm"/"bãi bỏ"/"thôi việc"/"từ chức"/"nghỉ việc".
-   - Trích xuất lý do vào trường "reason" nếu nếu có kỷ luật, miễn nhiệm, bị cách chức, bãi bỏ, thôi việc, từ chức, nghỉ việc.
-   
-2. **Locations**: Chỉ trích xuất địa danh (tỉnh/thành phố) liên quan đến:
-   - Nơi sinh (BORN_AT)
-   - Nơi mất (DIED_AT)
-
-3. **AlmaMater**: Trích xuất tên các trường học, học viện, đại học nơi chính trị gia theo học.
-
-4. **MilitaryCareers**: Trích xuất đơn vị quân đội/công an phục vụ với khoảng thời gian (nếu có).
-
-5. **MilitaryRanks**: Trích xuất cấp bậc quân đội/công an (VD: Đại tướng, Trung tướng, Thiếu tướng, Đại tá...).
-
-6. **Awards**: Chỉ trích xuất các huân chương, huy chương, danh hiệu CHÍNH THỨC.
-
-7. **Campaigns**: Các chiến dịch quân sự đã tham chiến.
-
-8. **AcademicTitles**: Học hàm, học vị (VD: Tiến sĩ, Phó giáo sư, Giáo sư, Thạc sĩ...).
-
-9. **SuccessionRelations**: Quan hệ kế nhiệm/tiền nhiệm với chính trị gia KHÁC (phải có tên người và chức vụ liên quan).
-
-**LƯU Ý**: Chỉ trích xuất thông tin CÓ TRONG văn bản. KHÔNG bịa đặt.
-"""
+    def generate_node_id(self, label: str, politician_id: str, index: int) -> str:
+        """
+        Generate node ID theo format: prefix + politician_base_id + _index
+        VD: pos19498354_001, loc436788_001, awa436788_002
+        """
+        return f"{self.node_id_prefix(label, politician_id)}{index:03d}"
+    
+    def build_prompt(self, summary: str, politician_name: str, politician_id: str) -> str:
+        return PROMPT_TEMPLATE.format(
+            politician_name=politician_name,
+            politician_id=politician_id,
+            summary=summary
+        )
+    
+    def _cache_response(self, cache_key: str, response_text: str):
+        if self.cache:
+            self.cache.set(cache_key, response_text)
+    
+    async def extract_from_summary(self, summary: str, politician_name: str, politician_id: str) -> Dict:
+        cache_key = make_cache_key(PROMPT_VERSION, summary)
+        if self.cache:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                logger.info(f"Cache hit for {politician_name}")
+                return json.loads(cached)
         
-        current_time = time.time()
-        time_since_last = current_time - self.last_request_time
-        if time_since_last < self.request_interval:
-            sleep_time = self.request_interval - time_since_last
-            time.sleep(sleep_time)
+        prompt = self.build_prompt(summary, politician_name, politician_id)
         
-        try:
-            response = self.model.generate_content(prompt)
-            self.last_request_time = time.time()
-            
-            try:
-                result = json.loads(response.text)
-            except json.JSONDecodeError as json_err:
-                logger.error(f"JSON decode error for {politician_name}: {json_err}")
-                logger.debug(f"Response text: {response.text[:500]}...")  # Log first 500 chars
+        for attempt in range(self.max_retries):
+            async with self._semaphore:
+                await self._wait_for_rate_limit()
+                model = self.model
+                response = None
                 
-                # Try to fix common issues
                 try:
+                    response = await model.generate_content_async(prompt)
                     # Remove potential BOM or invisible characters
-                    cleaned_text = response.text.strip()
-                    result = json.loads(cleaned_text)
-                except:
-                    logger.error(f"Failed to parse JSON even after cleaning for {politician_name}")
-                    self.stats["errors"] += 1
-                    return None
-            
-            logger.info(f"Successfully extracted data for {politician_name}")
-            return result
+                    text = response.text.strip()
+                    result = json.loads(text)
+                except Exception as e:
+                    error = e
+                else:
+                    self._cache_response(cache_key, text)
+                    logger.info(f"Successfully extracted data for {politician_name}")
+                    return result
             
-        except Exception as e:
-            error_str = str(e).lower()
+            error_str = str(error).lower()
             
-            if any(err in error_str for err in ["quota", "rate limit", "429", "resource_exhausted", "too many requests"]):
-                logger.warning(f"Quota error detected for {politician_name}: {e}")
+            if isinstance(error, json.JSONDecodeError):
+                logger.warning(f"JSON decode error for {politician_name} (attempt {attempt + 1}/{self.max_retries}): {error}")
+                logger.debug(f"Response text: {response.text[:500]}...")  # Log first 500 chars
+            elif any(err in error_str for err in QUOTA_ERRORS):
+                logger.warning(f"Quota error detected for {politician_name}: {error}")
                 
-                if self.api_rotator.handle_api_error(e):
-                    self.model = genai.GenerativeModel(
-                        model_name="gemini-2.5-flash-lite",
-                        generation_config={
-                            "response_mime_type": "application/json",
-                            "response_schema": ENRICHMENT_SCHEMA,
-                            "temperature": 0.1
-                        }
-                    )
-                    logger.info(f"Retrying with new key: {self.api_rotator.get_current_key_name()}")
-                    
-                    time.sleep(2)
-                    try:
-                        response = self.model.generate_content(prompt)
-                        result = json.loads(response.text)
-                        logger.info(f"Successfully extracted data for {politician_name} with rotated key")
-                        return result
-                    except Exception as retry_error:
-                        logger.error(f"Retry failed for {politician_name}: {retry_error}")
-                        self.stats["errors"] += 1
+                # Another in-flight request may already have rotated the key
+                if self.model is model:
+                    if not self.api_rotator.handle_api_error(error):
+                        logger.error(f"All API keys exhausted!")
+                        self._count_error()
                         return None
-                else:
-                    logger.error(f"All API keys exhausted!")
-                    self.stats["errors"] += 1
-                    return None
+                    self.model = self._create_model()
+                logger.info(f"Retrying with new key: {self.api_rotator.get_current_key_name()}")
+            elif isinstance(error, TRANSIENT_ERRORS):
+                logger.warning(f"Transient error for {politician_name} (attempt {attempt + 1}/{self.max_retries}): {error}")
             else:
-                logger.error(f"Error extracting summary for {politician_name}: {e}")
-                self.stats["errors"] += 1
+                logger.error(f"Error extracting summary for {politician_name}: {error}")
+                self._count_error()
                 return None
+            
+            if attempt < self.max_retries - 1:
+                # Exponential backoff with jitter, outside the semaphore so other requests proceed
+                await asyncio.sleep(min(2 ** attempt, self.max_retry_wait) + random.uniform(0, 1))
+        
+        logger.error(f"Giving up on {politician_name} after {self.max_retries} attempts")
+        self._count_error()
+        return None
     
-    def check_node_exists(self, session, label: str, name: str = None, node_id: str = None) -> str:
-        if node_id:
-            query = f"""
-            MATCH (n:{label} WHERE n.id = $node_id)
-            RETURN n.id AS id
-            """
-            result = session.run(query, node_id=node_id)
-        elif name:
-            query = f"""
-            MATCH (n:{label} WHERE toLower(n.name) = toLower($name))
-            RETURN n.id AS id
-            """
-            result = session.run(query, name=name)
-        else:
-            return None
+    def check_nodes_exist(self, session, label: str, names: List[str]) -> Dict[str, str]:
+        """
+        Look up existing nodes of one label by name, from the node cache first and then
+        with a single query for the misses. Only reads the cache: it runs inside a
+        transaction function, and _record_write caches the ids once the write commits.
+        Returns a dict lower(name) -> node id.
+        """
+        names_lower = {name.lower() for name in names if name}
+        
+        existing_ids = {}
+        missing = []
+        for name_lc in names_lower:
+            node_id = self.node_cache.get((label, name_lc))
+            if node_id:
+                existing_ids[name_lc] = node_id
+            else:
+                missing.append(name_lc)
         
-        record = result.single()
-        return record["id"] if record else None
+        if missing:
+            for record in session.run(NODES_BY_NAME_QUERIES[label], names=missing):
+                existing_ids[record["name"]] = record["id"]
+        
+        return existing_ids
     
-    def create_or_merge_node(self, session, label: str, node_id: str, name: str, properties: Dict = None):
+    def _node_row(self, label: str, node_id: str, name: str, properties: Dict = None) -> Dict:
         props = properties or {}
         props["source"] = "llm_enrichment"
         props["type"] = label
         props["name"] = name
-        
-        # MERGE by ID, set all properties
-        query = f"""
-        MERGE (n:{label} {{id: $node_id}})
-        ON CREATE SET n += $props, n.created_at = datetime()
-        ON MATCH SET n.enriched = true, n.last_updated = datetime()
-        RETURN n.id AS id
-        """
-        result = session.run(query, node_id=node_id, props=props)
-        record = result.single()
-        return record["id"] if record else None
+        props["name_lc"] = name.lower()
+        return {"id": node_id, "props": props}
     
-    def create_edge(self, session, from_id: str, to_node_id: str, to_node_label: str,
-                    edge_type: str, properties: Dict = None):
+    def _edge_row(self, to_node_id: str, edge_type: str, properties: Dict = None) -> Dict:
         props = properties or {}
         props["source"] = "llm_enrichment"
         props["type"] = edge_type
-        
-        query = f"""
-        MATCH (p:Politician WHERE p.id = $from_id)
-        MATCH (t:{to_node_label} WHERE t.id = $to_id)
-        MERGE (p)-[r:{edge_type}]->(t)
-        ON CREATE SET r += $props, r.created_at = datetime()
-        RETURN type(r) AS rel_type
-        """
-        try:
-            result = session.run(query, from_id=from_id, to_id=to_node_id, props=props)
-            record = result.single()
-            return record is not None
-        except Exception:
-            return False
+        return {"to": to_node_id, "props": props}
     
-    def enrich_politician(self, session, politician: Dict):
+    async def extract_politician(self, politician: Dict) -> Dict:
+        """
+        Run the LLM extraction for a single politician, None if skipped or failed
         """
-        Main function to enrich a single politician node in Neo4j
-        """        
         summary = politician.get("summary", "")
         if not summary or len(summary) < 50:
-            return  # Bỏ qua nếu summary quá ngắn
+            return None  # Bỏ qua nếu summary quá ngắn
         
         pol_id = f"pol{politician['id']}"
         pol_name = politician["title"]
         
         # Trích xuất dữ liệu từ LLM
-        extracted = self.extract_from_summary(summary, pol_name, pol_id)
-        if not extracted:
-            return
-        
-        for idx, pos in enumerate(extracted.get("positions", []), start=1):
-            pos_name = pos.get("name")
-            if not pos_name:
+        return await self.extract_from_summary(summary, pol_name, pol_id)
+    
+    def _process_category(self, tx, pol_id: str, pol_name: str, category: str, label: str,
+                          edge_type: Optional[str], items: List[Dict], node_props, edge_props,
+                          log_fields: Tuple[str, ...], nodes: Dict, edges: Dict, new_nodes: List,
+                          resolved: Dict):
+        """
+        Add the node and edge rows of one extraction category (see CATEGORIES) to the write batch,
+        and every (label, lower(name)) -> node id it refers to to `resolved`.
+        """
+        existing_ids = self.check_nodes_exist(tx, label, [item.get("name") for item in items])
+        for idx, item in enumerate(items, start=1):
+            name = item.get("name")
+            if not name:
                 continue
             
-            existing_id = self.check_node_exists(session, "Position", name=pos_name)
-            
-            if not existing_id:
-                pos_id = self.generate_node_id("Position", pol_id, idx)
-                self.create_or_merge_node(session, "Position", pos_id, pos_name)
-                self.stats["positions_added"] += 1
-                self.detailed_logs["positions"].append({
-                    "id": pos_id,
-                    "name": pos_name,
-                    "politician_id": pol_id,
-                    "politician_name": pol_name,
-                    "organization": pos.get("organization", "")
-                })
-            else:
-                pos_id = existing_id
-            
-            edge_props = {
-                "term_start": pos.get("term_start", ""),
-                "term_end": pos.get("term_end", ""),
-                "status": pos.get("status", ""),
-                "reason": pos.get("reason", "")
-            }
-            edge_props = {k: v for k, v in edge_props.items() if v}
-            
-            if self.create_edge(session, pol_id, pos_id, "Position", "SERVED_AS", edge_props):
-                self.stats["edges_added"] += 1
-                self.detailed_logs["edges"].append({
-                    "type": "SERVED_AS",
-                    "from": pol_id,
-                    "to": pos_id,
-                    "properties": edge_props
-                })
-        
-        for idx, loc in enumerate(extracted.get("locations", []), start=1):
-            loc_name = loc.get("name")
-            relation = loc.get("relation", "BORN_AT")
-            
-            if not loc_name:
+            relation = edge_type or item.get("relation", "BORN_AT")
+            if EDGE_TARGET_LABELS.get(relation) != label:
+                logger.warning(f"Skipping unsupported {category} relation {relation} for {pol_name}")
                 continue
             
-            existing_id = self.check_node_exists(session, "Location", name=loc_name)
-            
-            if not existing_id:
-                loc_id = self.generate_node_id("Location", pol_id, idx)
-                self.create_or_merge_node(session, "Location", loc_id, loc_name)
-                self.stats["locations_added"] += 1
-                self.detailed_logs["locations"].append({
-                    "id": loc_id,
-                    "name": loc_name,
-                    "politician_id": pol_id,
-                    "politician_name": pol_name,
-                    "relation": relation
-                })
-            else:
-                loc_id = existing_id
-            
-            if self.create_edge(session, pol_id, loc_id, "Location", relation):
-                self.stats["edges_added"] += 1
-                self.detailed_logs["edges"].append({
-                    "type": relation,
-                    "from": pol_id,
-                    "to": loc_id,
-                    "properties": {}
-                })
-        
-        for idx, school in enumerate(extracted.get("alma_mater", []), start=1):
-            school_name = school.get("name")
-            
-            if not school_name:
-                continue
-            
-            existing_id = self.check_node_exists(session, "AlmaMater", name=school_name)
-            
-            if not existing_id:
-                alm_id = self.generate_node_id("AlmaMater", pol_id, idx)
-                self.create_or_merge_node(session, "AlmaMater", alm_id, school_name)
-                self.stats["alma_mater_added"] += 1
-                self.detailed_logs["alma_mater"].append({
-                    "id": alm_id,
-                    "name": school_name,
+            node_id = existing_ids.get(name.lower())
+            if not node_id:
+                node_id = self.generate_node_id(label, pol_id, idx)
+                existing_ids[name.lower()] = node_id
+                nodes[label].append(self._node_row(label, node_id, name, node_props(item) if node_props else None))
+                entry = {
+                    "id": node_id,
+                    "name": name,
                     "politician_id": pol_id,
                     "politician_name": pol_name
-                })
-            else:
-                alm_id = existing_id
-            
-            if self.create_edge(session, pol_id, alm_id, "AlmaMater", "ALUMNUS_OF"):
-                self.stats["edges_added"] += 1
-                self.detailed_logs["edges"].append({
-                    "type": "ALUMNUS_OF",
-                    "from": pol_id,
-                    "to": alm_id,
-                    "properties": {}
-                })
+                }
+                entry.update({field: item.get(field, "") for field in log_fields})
+                if edge_type is None:
+                    entry["relation"] = relation
+                new_nodes.append((category, entry))
+            resolved[(label, name.lower())] = node_id
+            
+            edge_row = self._edge_row(node_id, relation, edge_props(item) if edge_props else None)
+            # Resolved to the final node id just before the edge query (see _write_to_neo4j)
+            edge_row["to_name_lc"] = name.lower()
+            edges[relation].append(edge_row)
+    
+    def _write_to_neo4j(self, tx, politician: Dict, extracted: Dict) -> Dict:
+        """
+        Transaction function writing a single politician's extracted data to Neo4j.
+        New nodes are written by one UNWIND query and all edges by a second one.
+        Has no side effects outside the transaction, since the driver may retry it;
+        returns what was written for _record_write.
+        """        
+        pol_id = f"pol{politician['id']}"
+        pol_name = politician["title"]
         
-        for idx, military in enumerate(extracted.get("military_careers", []), start=1):
-            unit_name = military.get("name")
-            
-            if not unit_name:
-                continue
-            
-            existing_id = self.check_node_exists(session, "MilitaryCareer", name=unit_name)
-            
-            if not existing_id:
-                mil_id = self.generate_node_id("MilitaryCareer", pol_id, idx)
-                self.create_or_merge_node(session, "MilitaryCareer", mil_id, unit_name)
-                self.stats["military_careers_added"] += 1
-                self.detailed_logs["military_careers"].append({
-                    "id": mil_id,
-                    "name": unit_name,
-                    "politician_id": pol_id,
-                    "politician_name": pol_name,
-                    "year_start": military.get("year_start", ""),
-                    "year_end": military.get("year_end", "")
-                })
-            else:
-                mil_id = existing_id
-            
-            edge_props = {}
-            if military.get("year_start"):
-                try:
-                    edge_props["year_start"] = int(military.get("year_start"))
-                except (ValueError, TypeError):
-                    pass
-            if military.get("year_end"):
-                try:
-                    edge_props["year_end"] = int(military.get("year_end"))
-                except (ValueError, TypeError):
-                    pass
-            
-            if self.create_edge(session, pol_id, mil_id, "MilitaryCareer", "SERVED_IN", edge_props):
-                self.stats["edges_added"] += 1
-                self.detailed_logs["edges"].append({
-                    "type": "SERVED_IN",
-                    "from": pol_id,
-                    "to": mil_id,
-                    "properties": edge_props
-                })
+        nodes = {label: [] for label in ENRICHMENT_NODE_LABELS}
+        edges = {edge_type: [] for edge_type, _ in ENRICHMENT_EDGE_TYPES}
+        # (category, detailed log entry) of nodes created by this write
+        new_nodes = []
+        # (label, lower(name)) -> id of every node the edges point at
+        resolved = {}
         
-        for idx, rank in enumerate(extracted.get("military_ranks", []), start=1):
-            rank_name = rank.get("name")
-            
-            if not rank_name:
+        for category, label, edge_type, node_props, edge_props, log_fields in self.CATEGORIES:
+            items = extracted.get(category)
+            if not items:
                 continue
-            
-            existing_id = self.check_node_exists(session, "MilitaryRank", name=rank_name)
-            
-            if not existing_id:
-                rank_id = self.generate_node_id("MilitaryRank", pol_id, idx)
-                self.create_or_merge_node(session, "MilitaryRank", rank_id, rank_name)
-                self.stats["military_ranks_added"] += 1
-                self.detailed_logs["military_ranks"].append({
-                    "id": rank_id,
-                    "name": rank_name,
-                    "politician_id": pol_id,
-                    "politician_name": pol_name
-                })
-            else:
-                rank_id = existing_id
-            
-            if self.create_edge(session, pol_id, rank_id, "MilitaryRank", "HAS_RANK"):
-                self.stats["edges_added"] += 1
-                self.detailed_logs["edges"].append({
-                    "type": "HAS_RANK",
-                    "from": pol_id,
-                    "to": rank_id,
-                    "properties": {}
-                })
+            self._process_category(
+                tx, pol_id, pol_name, category, label, edge_type, items,
+                node_props, edge_props, log_fields, nodes, edges, new_nodes, resolved
+            )
         
-        for idx, award in enumerate(extracted.get("awards", []), start=1):
-            award_name = award.get("name")
-            if not award_name:
-                continue
-            
-            existing_id = self.check_node_exists(session, "Award", name=award_name)
-            
-            if not existing_id:
-                awa_id = self.generate_node_id("Award", pol_id, idx)
-                props = {"year": award.get("year", "")} if award.get("year") else {}
-                self.create_or_merge_node(session, "Award", awa_id, award_name, props)
-                self.stats["awards_added"] += 1
-                self.detailed_logs["awards"].append({
-                    "id": awa_id,
-                    "name": award_name,
-                    "politician_id": pol_id,
-                    "politician_name": pol_name,
-                    "year": award.get("year", "")
-                })
-            else:
-                awa_id = existing_id
-            
-            if self.create_edge(session, pol_id, awa_id, "Award", "AWARDED"):
-                self.stats["edges_added"] += 1
-                self.detailed_logs["edges"].append({
-                    "type": "AWARDED",
-                    "from": pol_id,
-                    "to": awa_id,
-                    "properties": {}
-                })
+        ts = datetime.now(timezone.utc)
+        if any(nodes.values()):
+            new_nodes = self._assign_free_ids(tx, pol_id, nodes, new_nodes, resolved)
+            
+            record = tx.run(ENRICHMENT_NODE_QUERY, pol_id=pol_id, nodes=nodes, ts=ts).single()
+            if record is None:
+                return {"found": False}
+            
+            # A concurrent writer may have created the same entity first; use its node instead
+            remap = {}
+            for label, pairs in record["ids"].items():
+                for name_lc, node_id in pairs:
+                    if resolved[(label, name_lc)] != node_id:
+                        remap[(label, resolved[(label, name_lc)])] = node_id
+                        resolved[(label, name_lc)] = node_id
+            new_nodes = self._remap_ids(remap, new_nodes, drop_new=True)
         
-        for idx, campaign in enumerate(extracted.get("campaigns", []), start=1):
-            campaign_name = campaign.get("name")
-            
-            if not campaign_name:
-                continue
-            
-            existing_id = self.check_node_exists(session, "Campaigns", name=campaign_name)
-            
-            if not existing_id:
-                cam_id = self.generate_node_id("Campaigns", pol_id, idx)
-                props = {"year": campaign.get("year", "")} if campaign.get("year") else {}
-                self.create_or_merge_node(session, "Campaigns", cam_id, campaign_name, props)
-                self.stats["campaigns_added"] += 1
-                self.detailed_logs["campaigns"].append({
-                    "id": cam_id,
-                    "name": campaign_name,
-                    "politician_id": pol_id,
-                    "politician_name": pol_name,
-                    "year": campaign.get("year", "")
-                })
-            else:
-                cam_id = existing_id
-            
-            if self.create_edge(session, pol_id, cam_id, "Campaigns", "FOUGHT_IN"):
-                self.stats["edges_added"] += 1
-                self.detailed_logs["edges"].append({
-                    "type": "FOUGHT_IN",
-                    "from": pol_id,
-                    "to": cam_id,
-                    "properties": {}
-                })
+        # Edges are keyed by name until here, since new node ids may still have moved
+        for edge_type, rows in edges.items():
+            label = EDGE_TARGET_LABELS[edge_type]
+            for row in rows:
+                row["to"] = resolved[(label, row.pop("to_name_lc"))]
         
-        for idx, title in enumerate(extracted.get("academic_titles", []), start=1):
-            title_name = title.get("name")
-            
-            if not title_name:
-                continue
-            
-            existing_id = self.check_node_exists(session, "AcademicTitle", name=title_name)
-            
-            if not existing_id:
-                aca_id = self.generate_node_id("AcademicTitle", pol_id, idx)
-                self.create_or_merge_node(session, "AcademicTitle", aca_id, title_name)
-                self.stats["academic_titles_added"] += 1
-                self.detailed_logs["academic_titles"].append({
-                    "id": aca_id,
-                    "name": title_name,
-                    "politician_id": pol_id,
-                    "politician_name": pol_name
-                })
-            else:
-                aca_id = existing_id
-            
-            if self.create_edge(session, pol_id, aca_id, "AcademicTitle", "HAS_ACADEMIC_TITLE"):
-                self.stats["edges_added"] += 1
-                self.detailed_logs["edges"].append({
-                    "type": "HAS_ACADEMIC_TITLE",
-                    "from": pol_id,
-                    "to": aca_id,
-                    "properties": {}
-                })
+        record = tx.run(ENRICHMENT_EDGE_QUERY, pol_id=pol_id, edges=edges, ts=ts).single()
+        if record is None:
+            return {"found": False}
         
-        for rel in extracted.get("succession_relations", []):
-            person_name = rel.get("person_name")
-            rel_type = rel.get("relation_type")  # SUCCEEDED hoặc PRECEDED
-            position_name = rel.get("position", "")
-            
-            if not person_name or not rel_type:
-                continue
-            
-            position_id = None
-            if position_name:
-                try:
-                    pos_query = """
-                    MATCH (pos:Position WHERE toLower(pos.name) = toLower($position_name))
-                    RETURN pos.id AS position_id
-                    LIMIT 1
-                    """
-                    pos_result = session.run(pos_query, position_name=position_name)
-                    pos_record = pos_result.single()
-                    if pos_record:
-                        position_id = pos_record["position_id"]
-                except Exception:
-                    pass
-            
-            query = f"""
-            MATCH (p:Politician WHERE p.id = $from_id)
-            MATCH (target:Politician WHERE toLower(target.name) CONTAINS toLower($person_name))
-            MERGE (p)-[r:{rel_type}]->(target)
-            ON CREATE SET r.position_id = $position_id, r.context = $context, r.source = 'llm_enrichment', r.type = $rel_type
-            RETURN count(r) AS created
-            """
-            try:
-                result = session.run(
-                    query,
-                    from_id=pol_id,
-                    person_name=person_name,
-                    position_id=position_id,
-                    context=rel.get("context", ""),
-                    rel_type=rel_type
-                )
-                record = result.single()
-                if record and record["created"] > 0:
-                    self.stats["edges_added"] += 1
-            except Exception:
-                pass
+        return {
+            "found": True,
+            "resolved": resolved,
+            "new_nodes": new_nodes,
+            "edges": edges,
+            "edges_added": record["edges_added"]
+        }
+    
+    def _assign_free_ids(self, tx, pol_id: str, nodes: Dict, new_nodes: List, resolved: Dict) -> List:
+        """
+        Generated ids follow the same scheme as the graph import (see build_kgs), so one may
+        already belong to another node of the label, imported from the infobox or written by
+        an earlier run under a different name. Such rows move to the next free index.
+        Returns new_nodes with the updated ids.
+        """
+        prefixes = {label: self.node_id_prefix(label, pol_id) if rows else None for label, rows in nodes.items()}
+        taken = {label: set() for label in nodes}
+        for record in tx.run(TAKEN_IDS_QUERY, prefixes=prefixes):
+            taken[record["label"]].add(record["id"])
+        
+        remap = {}
+        for label, rows in nodes.items():
+            used = taken[label] | {row["id"] for row in rows}
+            index = 0
+            for row in rows:
+                if row["id"] not in taken[label]:
+                    continue
+                node_id = row["id"]
+                while node_id in used:
+                    index += 1
+                    node_id = self.generate_node_id(label, pol_id, index)
+                used.add(node_id)
+                remap[(label, row["id"])] = node_id
+                resolved[(label, row["props"]["name_lc"])] = node_id
+                row["id"] = node_id
+        return self._remap_ids(remap, new_nodes, drop_new=False)
+    
+    def _remap_ids(self, remap: Dict, new_nodes: List, drop_new: bool) -> List:
+        """
+        Apply (label, old id) -> new id to the new_nodes entries: dropped when the node turned
+        out to exist already, renamed otherwise.
+        """
+        if not remap:
+            return new_nodes
+        
+        category_labels = {category: label for category, label, *_ in self.CATEGORIES}
+        remapped = []
+        for category, entry in new_nodes:
+            key = (category_labels[category], entry["id"])
+            if key in remap:
+                if drop_new:
+                    continue
+                entry["id"] = remap[key]
+            remapped.append((category, entry))
+        return remapped
+    
+    def _record_write(self, politician: Dict, extracted: Dict, result: Dict):
+        """
+        Apply the side effects of a committed write: node cache, statistics and detailed log.
+        """
+        pol_id = f"pol{politician['id']}"
+        pol_name = politician["title"]
+        detailed_log = {"politician_id": pol_id, "politician_name": pol_name}
         
         enrichment_summary = {
-            "politician_id": pol_id,
-            "politician_name": pol_name,
             "positions_extracted": len(extracted.get("positions", [])),
             "locations_extracted": len(extracted.get("locations", [])),
             "alma_mater_extracted": len(extracted.get("alma_mater", [])),
@@ -604,50 +656,188 @@ Bạn là chuyên gia phân tích tiểu sử chính trị gia. Hãy trích xu
             "academic_titles_extracted": len(extracted.get("academic_titles", [])),
             "succession_relations_extracted": len(extracted.get("succession_relations", []))
         }
-        self.enrichment_log.append(enrichment_summary)
-        logger.info(f"Enriched {pol_name}: {enrichment_summary}")
         
-        self.stats["processed"] += 1
+        with self._record_lock:
+            if not result["found"]:
+                logger.warning(f"Politician {pol_id} not found in Neo4j, nothing written for {pol_name}")
+            else:
+                self.node_cache.update(result["resolved"])
+                
+                for category, entry in result["new_nodes"]:
+                    self.stats[f"{category}_added"] += 1
+                    detailed_log.setdefault(category, []).append(entry)
+                
+                self.stats["edges_added"] += result["edges_added"]
+                
+                for rel in extracted.get("succession_relations", []):
+                    person_name = rel.get("person_name")
+                    rel_type = rel.get("relation_type")  # SUCCEEDED hoặc PRECEDED
+                    if person_name and rel_type in SUCCESSION_REL_TYPES:
+                        self.pending_succession.append(
+                            (pol_id, person_name, rel_type, rel.get("position", ""), rel.get("context", ""))
+                        )
+                detailed_log["edges"] = [
+                    {
+                        "type": edge_type,
+                        "from": pol_id,
+                        "to": row["to"],
+                        "properties": {k: v for k, v in row["props"].items() if k not in ("source", "type")}
+                    }
+                    for edge_type, rows in result["edges"].items()
+                    for row in rows
+                ]
+            
+            logger.info(f"Enriched {pol_name}: {enrichment_summary}")
+            
+            detailed_log["summary"] = enrichment_summary
+            self.log_fp.write(orjson.dumps(detailed_log) + b"\n")
+            self.log_fp.flush()
+            
+            self.stats["processed"] += 1
     
-    def save_detailed_logs(self):
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        log_file = f"enrichment/result/detailed_enrichment_{timestamp}.json"
+    def resolve_succession_relations(self):
+        """
+        Post-pass writing every collected succession relation. Target politicians are matched
+        against a name map loaded once (exact name first, then substring like the old CONTAINS
+        lookup), and the edges are written with one UNWIND query per relation type.
+        """
+        if not self.pending_succession:
+            return
         
-        os.makedirs("enrichment/result", exist_ok=True)
+        with self.driver.session(database=settings.NEO4J_DATABASE) as session:
+            result = session.run("MATCH (p:Politician) WHERE p.name IS NOT NULL RETURN p.id AS id, toLower(p.name) AS name")
+            name_to_id = {record["name"]: record["id"] for record in result}
+            
+            rels = {rel_type: [] for rel_type in SUCCESSION_REL_TYPES}
+            for from_id, person_name, rel_type, position_name, context in self.pending_succession:
+                person_lc = person_name.lower()
+                to_id = name_to_id.get(person_lc)
+                if to_id is None:
+                    to_id = next((pid for name, pid in name_to_id.items() if person_lc in name), None)
+                if to_id is None or to_id == from_id:
+                    continue
+                rels[rel_type].append({
+                    "from": from_id,
+                    "to": to_id,
+                    "position_id": self.node_cache.get(("Position", position_name.lower())) if position_name else None,
+                    "context": context
+                })
+            
+            for rel_type, rows in rels.items():
+                if not rows:
+                    continue
+                record = session.run(SUCCESSION_WRITE_QUERIES[rel_type], rels=rows, rel_type=rel_type).single()
+                self.stats["edges_added"] += record["edges"] if record else 0
+        
+        self.pending_succession.clear()
+    
+    def _enrich_one(self, politician: Dict, extracted: Dict):
+        """
+        Write one politician in its own session as a single managed write transaction.
+        Safe to call from several threads: the driver pools connections across sessions.
+        """
+        with self.driver.session(database=settings.NEO4J_DATABASE) as session:
+            result = session.execute_write(self._write_to_neo4j, politician, extracted)
+        self._record_write(politician, extracted, result)
+    
+    def save_detailed_logs(self):
+        """
+        Detailed data is already streamed to the NDJSON log; only the statistics are written here.
+        """
+        stats_file = f"enrichment/result/detailed_enrichment_{self.log_timestamp}_stats.json"
         
         output = {
-            "timestamp": timestamp,
+            "timestamp": self.log_timestamp,
             "statistics": self.stats,
-            "detailed_data": self.detailed_logs
+            "detailed_log_file": self.log_file
         }
         
-        with open(log_file, 'w', encoding='utf-8') as f:
-            json.dump(output, f, ensure_ascii=False, indent=2)
+        with open(stats_file, 'wb') as f:
+            f.write(orjson.dumps(output, option=orjson.OPT_INDENT_2))
         
-        logger.info(f"Detailed logs saved to {log_file}")
-        print(f"\nDetailed logs saved to: {log_file}")
+        logger.info(f"Detailed logs saved to {self.log_file}, statistics to {stats_file}")
+        print(f"\nDetailed logs saved to: {self.log_file}")
     
-    def run_enrichment(self, input_file: str, limit: int = None, skip: int = 0):        
-        print(f"Reading politicians data from {input_file}...")
-        with open(input_file, 'r', encoding='utf-8') as f:
-            politicians = json.load(f)
-        
-        if limit:
-            politicians = politicians[skip:skip+limit]
-        else:
-            politicians = politicians[skip:]
+    async def _run_enrichment_async(self, politicians: Iterator[Dict], max_concurrency: int,
+                                    write_workers: int, total: int = None):
+        """
+        LLM calls run concurrently (bounded by a semaphore and the request interval) and feed
+        a queue; the consumer hands each result to a pool of writer threads, each with its own
+        Neo4j session, so Bolt I/O overlaps with the pending LLM requests. Politicians are pulled
+        from the iterator only as fast as tasks complete, so the input is never fully materialized.
+        """
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._rate_lock = asyncio.Lock()
+        queue = asyncio.Queue()
+        loop = asyncio.get_running_loop()
+
+        async def produce(politician: Dict):
+            try:
+                extracted = await self.extract_politician(politician)
+            except Exception as e:
+                print(f"\nError processing {politician.get('title')}: {e}")
+                self._count_error()
+                extracted = None
+            await queue.put((politician, extracted))
+
+        async def write(politician: Dict, extracted: Dict, progress):
+            try:
+                await loop.run_in_executor(write_pool, self._enrich_one, politician, extracted)
+            except Exception as e:
+                print(f"\nError processing {politician.get('title')}: {e}")
+                self._count_error()
+            progress.update(1)
+
+        async def consume(progress):
+            writes = set()
+            while (item := await queue.get()) is not None:
+                politician, extracted = item
+                if extracted:
+                    task = asyncio.create_task(write(politician, extracted, progress))
+                    writes.add(task)
+                    task.add_done_callback(writes.discard)
+                else:
+                    progress.update(1)
+            await asyncio.gather(*writes)
+
+        with ThreadPoolExecutor(max_workers=write_workers) as write_pool, \
+                tqdm(total=total, desc="Enriching") as progress:
+            consumer = asyncio.create_task(consume(progress))
+            
+            pending = set()
+            for politician in politicians:
+                if len(pending) >= max_concurrency * 2:
+                    _, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                pending.add(asyncio.create_task(produce(politician)))
+            if pending:
+                await asyncio.wait(pending)
+            
+            await queue.put(None)
+            await consumer
+
+    def run_enrichment(self, input_file: str, limit: int = None, skip: int = 0,
+                       max_concurrency: int = 10, write_workers: int = 8):        
+        print(f"Processing politicians from {input_file} (starting from #{skip})...")
         
-        print(f"Processing {len(politicians)} politicians (starting from #{skip})...")
+        politicians = self.iter_politicians(input_file, limit, skip)
+        asyncio.run(self._run_enrichment_async(politicians, max_concurrency, write_workers, total=limit))
+        self.resolve_succession_relations()
         
-        with self.driver.session(database=settings.NEO4J_DATABASE) as session:
-            for politician in tqdm(politicians, desc="Enriching"):
-                try:
-                    self.enrich_politician(session, politician)
-                except Exception as e:
-                    print(f"\nError processing {politician.get('title')}: {e}")
-                    self.stats["errors"] += 1
+        self.report_statistics()
+    
+    def iter_politicians(self, input_file: str, limit: int = None, skip: int = 0) -> Iterator[Dict]:
+        """
+        Stream politicians from the input JSON array one at a time.
+        """
+        with open(input_file, 'rb') as f:
+            for i, politician in enumerate(ijson.items(f, 'item', use_float=True)):
+                if i < skip:
                     continue
-        
+                if limit and i >= skip + limit:
+                    break
+                yield politician
+    
+    def report_statistics(self):
         print("\n" + "="*60)
         print("ENRICHMENT STATISTICS")
         print("="*60)
@@ -657,20 +847,132 @@ Bạn là chuyên gia phân tích tiểu sử chính trị gia. Hãy trích xu
         print("="*60)
         
         self.save_detailed_logs()
+    
+    def build_batch_file(self, politicians: List[Dict], batch_file: str) -> int:
+        """
+        Write one Gemini batch request per politician (JSONL, keyed by politician node id).
+        Returns the number of requests written.
+        """
+        count = 0
+        with open(batch_file, 'w', encoding='utf-8') as f:
+            for politician in politicians:
+                summary = politician.get("summary", "")
+                if not summary or len(summary) < 50:
+                    continue
+                
+                pol_id = f"pol{politician['id']}"
+                request = {
+                    "key": pol_id,
+                    "request": {
+                        "contents": [{
+                            "role": "user",
+                            "parts": [{"text": self.build_prompt(summary, politician["title"], pol_id)}]
+                        }],
+                        "generationConfig": {
+                            "responseMimeType": "application/json",
+                            "responseSchema": ENRICHMENT_SCHEMA,
+                            "temperature": 0.1
+                        }
+                    }
+                }
+                f.write(json.dumps(request, ensure_ascii=False) + "\n")
+                count += 1
+        return count
+    
+    def run_batch_enrichment(self, input_file: str, limit: int = None, skip: int = 0,
+                             poll_interval: float = 30.0, max_poll_interval: float = 600.0):
+        """
+        Offline variant of run_enrichment: submit every prompt as one Gemini Batch API job,
+        poll it with exponential backoff, then write the results to Neo4j.
+        """
+        # The Batch API is only exposed by the newer google-genai SDK
+        from google import genai as genai_sdk
+        
+        politicians = list(self.iter_politicians(input_file, limit, skip))
+        politicians_by_id = {f"pol{p['id']}": p for p in politicians}
+        
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        os.makedirs("enrichment/result", exist_ok=True)
+        batch_file = f"enrichment/result/batch_requests_{timestamp}.jsonl"
+        
+        request_count = self.build_batch_file(politicians, batch_file)
+        print(f"Wrote {request_count} batch requests to {batch_file}")
+        if not request_count:
+            return
+        
+        client = genai_sdk.Client(api_key=self.api_rotator.get_current_key())
+        uploaded = client.files.upload(
+            file=batch_file,
+            config={"display_name": f"enrichment_{timestamp}", "mime_type": "jsonl"}
+        )
+        job = client.batches.create(
+            model="gemini-2.5-flash-lite",
+            src=uploaded.name,
+            config={"display_name": f"enrichment_{timestamp}"}
+        )
+        logger.info(f"Created batch job {job.name} with {request_count} requests")
+        
+        wait_time = poll_interval
+        while job.state.name not in BATCH_TERMINAL_STATES:
+            logger.info(f"Batch job {job.name} is {job.state.name}, checking again in {wait_time:.0f}s")
+            time.sleep(wait_time)
+            wait_time = min(wait_time * 2, max_poll_interval)
+            job = client.batches.get(name=job.name)
+        
+        if job.state.name != "JOB_STATE_SUCCEEDED":
+            logger.error(f"Batch job {job.name} finished with state {job.state.name}: {job.error}")
+            return
+        
+        results = client.files.download(file=job.dest.file_name).decode("utf-8")
+        
+        for line in tqdm(results.splitlines(), desc="Enriching"):
+            if not line.strip():
+                continue
+            row = json.loads(line)
+            politician = politicians_by_id.get(row.get("key"))
+            if politician is None:
+                continue
+            
+            try:
+                response = row.get("response") or {}
+                text = response["candidates"][0]["content"]["parts"][0]["text"]
+                extracted = json.loads(text)
+                self._cache_response(make_cache_key(PROMPT_VERSION, politician.get("summary", "")), text)
+            except (KeyError, IndexError, json.JSONDecodeError) as e:
+                logger.error(f"Invalid batch response for {politician.get('title')}: {row.get('error') or e}")
+                self._count_error()
+                continue
+            
+            try:
+                self._enrich_one(politician, extracted)
+            except Exception as e:
+                print(f"\nError processing {politician.get('title')}: {e}")
+                self._count_error()
+        
+        self.resolve_succession_relations()
+        self.report_statistics()
 
 
 if __name__ == "__main__":
-    enricher = Neo4jEnrichment()
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Enrich the Neo4j graph from politician summaries with Gemini")
+    parser.add_argument("--input_file", default="data/processed/expand/politicians_data_normalized.json")
+    parser.add_argument("--limit", type=int, default=None, help="Number of politicians to process")
+    parser.add_argument("--skip", type=int, default=0, help="Number of politicians to skip")
+    parser.add_argument("--batch", action="store_true", help="Use the Gemini Batch API (offline, no request throttling)")
+    parser.add_argument("--no-cache", action="store_true", help="Always call Gemini, ignoring cached responses")
+    args = parser.parse_args()
+    
+    enricher = Neo4jEnrichment(use_cache=not args.no_cache)
     
     try:
-        input_file = "data/processed/expand/politicians_data_normalized.json"
-        logger.info(f"Input file: {input_file}")
+        logger.info(f"Input file: {args.input_file}")
         
-        enricher.run_enrichment(
-            input_file=input_file,
-            # limit=1,
-            skip=0
-        )
+        if args.batch:
+            enricher.run_batch_enrichment(input_file=args.input_file, limit=args.limit, skip=args.skip)
+        else:
+            enricher.run_enrichment(input_file=args.input_file, limit=args.limit, skip=args.skip)
         logger.info("Enrichment completed successfully")
         
     except Exception as e:
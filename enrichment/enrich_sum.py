@@ -1,30 +1,28 @@
 # enrichment/enrich_sum.py
 
-import json
+import orjson
 from tqdm import tqdm
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 
 from utils.config import settings
-from graph.load_graph import load_graph_from_json
+from graph.load_graph import load_graph_from_data
 
-graph, node_info = load_graph_from_json(settings.INPUT_SUM_ENRICH_FILE)
+SUMMARY_CHUNKSIZE = 64
+# The loop bodies are cheap, so keep tqdm's per-iteration bookkeeping out of them
+TQDM_OPTIONS = {"mininterval": 1.0, "miniters": 256, "smoothing": 0}
 
-with open(settings.INPUT_SUM_ENRICH_FILE, "r", encoding="utf-8") as f:
-    kg = json.load(f)
-metadata = kg.get("metadata", {})
+# Read-only lookups used by build_summary, filled in by _init_worker in every process
+# source id -> rel type -> outgoing edges, so build_summary indexes each relation directly
+edges_by_src_rel = {}
+# id -> name, so build_summary resolves an edge target with a single dict lookup
+_NODE_NAME = {}
+_EMPTY = {}
 
-node_lookup = node_info
-
-edge_lookup = defaultdict(list)
-for u, v, k, data in graph.edges(keys=True, data=True):
-    rel_type = data.get("rel_type") or data.get("type") or "UNKNOWN"
-    props = data.get("properties", {})
-    edge_lookup[u].append({
-        "type": rel_type,
-        "from": u,
-        "to": v,
-        "properties": props
-    })
+def _init_worker(edges, node_names):
+    global edges_by_src_rel, _NODE_NAME
+    edges_by_src_rel = edges
+    _NODE_NAME = node_names
 
 def build_summary(pol):
     name = pol.get("name", "")
@@ -42,172 +40,155 @@ def build_summary(pol):
     if party:
         intro_parts.append(f"thuộc {party}")
     
-    summary = [", ".join(intro_parts) + "."]
-    
-    my_edges = edge_lookup.get(pol["id"], [])
-
     # CẠNH
+    rel = edges_by_src_rel.get(pol["id"], _EMPTY)
+
+    _node_name = _NODE_NAME.get
+
     # SERVED_AS
     positions = []
-    for edge in my_edges:
-        if edge["type"] == "SERVED_AS":
-            pos_id = edge.get("to")
-            pos = node_lookup.get(pos_id, {})
-            pos_name = pos.get("name", "")
-            
-            eprops = edge.get("properties", {})
-            t_start = eprops.get("term_start", "")
-            t_end = eprops.get("term_end", "")
-            status = eprops.get("status", "")
-            reason = eprops.get("reason", "")
-            
-            detail_parts = []
-            if t_start or t_end:
-                detail_parts.append(f"{t_start} - {t_end}")
-            
-            if status:
-                detail_parts.append(f"trạng thái: {status}")
-            
-            if reason:
-                detail_parts.append(f"lý do: {reason}")
-            
-            pos_str = pos_name
-            if detail_parts:
-                pos_str += f" ({', '.join(detail_parts)})"
-            
-            if pos_name:
-                positions.append(pos_str)
-                
-    if positions:
-        summary.append(f"Các chức vụ từng đảm nhiệm: {'; '.join(positions)}.")
-
-    # BORN_AT, DIED_AT
-    born_at = []
-    died_at = []
-    for edge in my_edges:
-        target = node_lookup.get(edge["to"], {}).get("name", "")
-        if not target: continue
+    for edge in rel.get("SERVED_AS", ()):
+        pos_name = _node_name(edge.get("to"), "")
+        if not pos_name:
+            continue
         
-        if edge["type"] == "BORN_AT":
-            born_at.append(target)
-        elif edge["type"] == "DIED_AT":
-            died_at.append(target)
-            
-    if born_at: summary.append(f"Sinh tại {', '.join(born_at)}.")
-    if died_at: summary.append(f"Mất tại {', '.join(died_at)}.")
-
-    # ALUMNUS_OF, HAS_ACADEMIC_TITLE
-    schools = []
-    titles = []
-    for edge in my_edges:
-        target = node_lookup.get(edge["to"], {}).get("name", "")
-        if not target: continue
+        eprops = edge.get("properties", {})
+        t_start = eprops.get("term_start", "")
+        t_end = eprops.get("term_end", "")
+        status = eprops.get("status", "")
+        reason = eprops.get("reason", "")
+        
+        detail_parts = []
+        if t_start or t_end:
+            detail_parts.append(f"{t_start} - {t_end}")
+        
+        if status:
+            detail_parts.append(f"trạng thái: {status}")
+        
+        if reason:
+            detail_parts.append(f"lý do: {reason}")
+        
+        pos_str = pos_name
+        if detail_parts:
+            pos_str += f" ({', '.join(detail_parts)})"
+        
+        positions.append(pos_str)
 
-        if edge["type"] == "ALUMNUS_OF":
-            schools.append(target)
-        elif edge["type"] == "HAS_ACADEMIC_TITLE":
-            titles.append(target)
-            
-    if schools: summary.append(f"Tốt nghiệp tại: {', '.join(schools)}.")
-    if titles: summary.append(f"Học hàm/học vị: {', '.join(titles)}.")
+    def target_names(rel_type):
+        names = (_node_name(edge["to"], "") for edge in rel.get(rel_type, ()))
+        return [name for name in names if name]
 
-    # SERVED_IN, HAS_RANK
+    # SERVED_IN
     mil_units = []
-    ranks = []
-    for edge in my_edges:
-        target = node_lookup.get(edge["to"], {}).get("name", "")
+    for edge in rel.get("SERVED_IN", ()):
+        target = _node_name(edge["to"], "")
         if not target: continue
         eprops = edge.get("properties", {})
-
-        if edge["type"] == "SERVED_IN":
-            y_start = eprops.get("year_start")
-            y_end = eprops.get("year_end")
-            time_str = f" ({y_start}-{y_end})" if y_start or y_end else ""
-            mil_units.append(f"{target}{time_str}")
-            
-        elif edge["type"] == "HAS_RANK":
-            ranks.append(target)
-
-    if mil_units: summary.append(f"Từng phục vụ tại: {', '.join(mil_units)}.")
-    if ranks: summary.append(f"Cấp bậc: {', '.join(ranks)}.")
+        y_start = eprops.get("year_start")
+        y_end = eprops.get("year_end")
+        time_str = f" ({y_start}-{y_end})" if y_start or y_end else ""
+        mil_units.append(f"{target}{time_str}")
 
     # AWARDED
     awards = []
-    for edge in my_edges:
-        if edge["type"] == "AWARDED":
-            target = node_lookup.get(edge["to"], {}).get("name", "")
-            year = edge.get("properties", {}).get("year")
-            if target:
-                if year: awards.append(f"{target} ({year})")
-                else: awards.append(target)
-    if awards: summary.append(f"Giải thưởng/Huân chương: {', '.join(awards)}.")
-
-    # FOUGHT_IN
-    campaigns = []
-    for edge in my_edges:
-        if edge["type"] == "FOUGHT_IN":
-            target = node_lookup.get(edge["to"], {}).get("name", "")
-            if target: campaigns.append(target)
-    if campaigns: summary.append(f"Tham gia chiến dịch: {', '.join(campaigns)}.")
-
-    # SUCCEEDED, PRECEDED
-    succeeded = []
-    preceded = []
-    for edge in my_edges:
-        target = node_lookup.get(edge["to"], {}).get("name", "")
-        if not target: continue
-        
-        if edge["type"] == "SUCCEEDED":
-            succeeded.append(target)
-        elif edge["type"] == "PRECEDED":
-            preceded.append(target)
-            
-    if succeeded: summary.append(f"Kế nhiệm: {', '.join(succeeded)}.")
-    if preceded: summary.append(f"Tiền nhiệm: {', '.join(preceded)}.")
-
-    return " ".join(summary)
-
-
-nodes_by_type = defaultdict(list)
-processed_ids = set()
-
-raw_nodes_list = []
-for nid, info in node_info.items():
-    raw_nodes_list.append({
-        "id": nid,
-        "name": info.get("name", ""),
-        "type": info.get("type", "UNKNOWN"),
-        "properties": info.get("properties", {})
-    })
-
-for node in tqdm(raw_nodes_list, desc="Processing Nodes"):
-    node_out = node.copy()
-    
-    if node["type"] == "Politician":
-        node_out["full_text_summary"] = build_summary(node)
-    
-    nodes_by_type[node["type"]].append(node_out)
-    processed_ids.add(node["id"])
-
-edges_by_type = defaultdict(list)
-for u, v, k, data in graph.edges(keys=True, data=True):
-    rel_type = data.get("rel_type") or data.get("type") or "UNKNOWN"
-    props = data.get("properties", {})
-    edge_entry = {
-        "from": u,
-        "to": v,
-        "type": rel_type,
-        "properties": props
-    }
-    edges_by_type[rel_type].append(edge_entry)
-
-output = {
-    "metadata": metadata,
-    "nodes": nodes_by_type,
-    "edges": edges_by_type
-}
-
-with open(settings.OUTPUT_SUM_ENRICH_FILE, "w", encoding="utf-8") as f:
-    json.dump(output, f, ensure_ascii=False, indent=2)
-
-print(f"Saved enriched graph to {settings.OUTPUT_SUM_ENRICH_FILE}")
\ No newline at end of file
+    for edge in rel.get("AWARDED", ()):
+        target = _node_name(edge["to"], "")
+        year = edge.get("properties", {}).get("year")
+        if target:
+            if year: awards.append(f"{target} ({year})")
+            else: awards.append(target)
+
+    # (sentence prefix, items, separator); a sentence is emitted only when it has items
+    sections = (
+        ("Các chức vụ từng đảm nhiệm: ", positions, "; "),
+        ("Sinh tại ", target_names("BORN_AT"), ", "),
+        ("Mất tại ", target_names("DIED_AT"), ", "),
+        ("Tốt nghiệp tại: ", target_names("ALUMNUS_OF"), ", "),
+        ("Học hàm/học vị: ", target_names("HAS_ACADEMIC_TITLE"), ", "),
+        ("Từng phục vụ tại: ", mil_units, ", "),
+        ("Cấp bậc: ", target_names("HAS_RANK"), ", "),
+        ("Giải thưởng/Huân chương: ", awards, ", "),
+        ("Tham gia chiến dịch: ", target_names("FOUGHT_IN"), ", "),
+        ("Kế nhiệm: ", target_names("SUCCEEDED"), ", "),
+        ("Tiền nhiệm: ", target_names("PRECEDED"), ", "),
+    )
+
+    intro = ", ".join(intro_parts) + "."
+    return " ".join([intro] + [prefix + sep.join(items) + "." for prefix, items, sep in sections if items])
+
+
+def _write_section(f, groups):
+    f.write(b"{")
+    for i, (group, items) in enumerate(groups.items()):
+        if i:
+            f.write(b",")
+        f.write(b"\n" + orjson.dumps(group) + b": " + orjson.dumps(items, option=orjson.OPT_NON_STR_KEYS))
+    f.write(b"\n}")
+
+
+def write_output(output_file, metadata, nodes_by_type, edges_by_type):
+    """
+    Write {"metadata", "nodes", "edges"} one node/edge type at a time, so neither the whole
+    output dict nor its full serialized bytes are held in memory at once.
+    """
+    with open(output_file, "wb") as f:
+        f.write(b'{"metadata": ' + orjson.dumps(metadata, option=orjson.OPT_NON_STR_KEYS) + b',\n"nodes": ')
+        _write_section(f, nodes_by_type)
+        f.write(b',\n"edges": ')
+        _write_section(f, edges_by_type)
+        f.write(b"}\n")
+
+
+def main(max_workers: int = None):
+    # Parse the KG once and build the graph from it, rather than reading the file a second time
+    with open(settings.INPUT_SUM_ENRICH_FILE, "rb") as f:
+        kg = orjson.loads(f.read())
+    metadata = kg.get("metadata", {})
+
+    graph, node_info = load_graph_from_data(kg)
+    del kg
+
+    node_names = {nid: (info.get("name") or "") for nid, info in node_info.items()}
+
+    # One traversal fills both the output grouping and the per-source lookup; the entry
+    # dicts are shared between them
+    edges = defaultdict(dict)
+    edges_by_type = defaultdict(list)
+    for u, v, k, data in graph.edges(keys=True, data=True):
+        rel_type = data.get("rel_type") or data.get("type") or "UNKNOWN"
+        edge_entry = {
+            "from": u,
+            "to": v,
+            "type": rel_type,
+            "properties": data.get("properties", {})
+        }
+        edges_by_type[rel_type].append(edge_entry)
+        edges[u].setdefault(rel_type, []).append(edge_entry)
+
+    nodes_by_type = defaultdict(list)
+    for nid, info in tqdm(node_info.items(), desc="Processing Nodes", **TQDM_OPTIONS):
+        node_type = info.get("type", "UNKNOWN")
+        nodes_by_type[node_type].append({
+            "id": nid,
+            "name": info.get("name", ""),
+            "type": node_type,
+            "properties": info.get("properties", {})
+        })
+
+    # Summaries are independent per politician, so they are built in a process pool and
+    # attached to the output entries in place
+    politicians = nodes_by_type.get("Politician", [])
+    _init_worker(edges, node_names)
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                             initargs=(edges, node_names)) as executor:
+        summaries = executor.map(build_summary, politicians, chunksize=SUMMARY_CHUNKSIZE)
+        for pol, summary in zip(politicians, tqdm(summaries, total=len(politicians), desc="Summarizing Politicians", **TQDM_OPTIONS)):
+            pol["full_text_summary"] = summary
+
+    write_output(settings.OUTPUT_SUM_ENRICH_FILE, metadata, nodes_by_type, edges_by_type)
+
+    print(f"Saved enriched graph to {settings.OUTPUT_SUM_ENRICH_FILE}")
+
+
+if __name__ == "__main__":
+    main()
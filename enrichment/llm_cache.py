@@ -0,0 +1,43 @@
+# ./enrichment/llm_cache.py
+
+import os
+import time
+import hashlib
+import sqlite3
+
+from typing import Optional
+
+DEFAULT_CACHE_FILE = "enrichment/cache/llm_cache.sqlite"
+
+def make_cache_key(prompt_version: str, text: str) -> str:
+    """
+    SHA-256 key of (prompt_version, text); bump prompt_version to invalidate old entries.
+    """
+    return hashlib.sha256(f"{prompt_version}|{text}".encode("utf-8")).hexdigest()
+
+class LLMCache:
+    """
+    Persistent on-disk cache of raw LLM responses, backed by SQLite.
+    """
+
+    def __init__(self, cache_file: str = DEFAULT_CACHE_FILE):
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+        self.conn = sqlite3.connect(cache_file)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache (hash TEXT PRIMARY KEY, response TEXT, created_at INT)"
+        )
+        self.conn.commit()
+
+    def get(self, key: str) -> Optional[str]:
+        row = self.conn.execute("SELECT response FROM cache WHERE hash = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set(self, key: str, value: str):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO cache (hash, response, created_at) VALUES (?, ?, ?)",
+            (key, value, int(time.time()))
+        )
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
@@ -2,9 +2,12 @@
 
 import json
 import re
+import orjson
 
 from pathlib import Path
-from typing import Dict, List, Set, Optional
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Set, Optional, Tuple
 from datetime import datetime
 
 import sys
@@ -13,12 +16,81 @@ from utils.queue_based_async_logger import get_async_logger
 
 log = get_async_logger("build_succession_edges", log_file="logs/graph/build_succession_edges.log")
 
+_WL_PIPE_RE = re.compile(r'\[\[([^|\]]+)\|([^\]]+)\]\]')
+_WL_RE = re.compile(r'\[\[([^\]]+)\]\]')
+_NAME_SPLIT_RE = re.compile(r',|;|<br\s*/?>|\n')
+
+# (office, predecessor, successor, position index) infobox keys for office, office2, ... office14
+_OFFICE_KEYS = tuple(
+    ('office', 'predecessor', 'successor', '001') if i == 1
+    else (f'office{i}', f'predecessor{i}', f'successor{i}', str(i).zfill(3))
+    for i in range(1, 15)
+)
+
+def _strip_tags(text: str) -> str:
+    """
+    Remove HTML tags, same result as re.sub(r'<[^>]+>', '', text) without the regex engine.
+    """
+    start = text.find('<')
+    if start < 0:
+        return text
+    
+    parts = []
+    pos = 0
+    while start >= 0:
+        # '<>' is not a tag (the pattern needs at least one character inside)
+        if text.startswith('>', start + 1):
+            start = text.find('<', start + 1)
+            continue
+        end = text.find('>', start + 1)
+        if end < 0:
+            break
+        parts.append(text[pos:start])
+        pos = end + 1
+        start = text.find('<', pos)
+    parts.append(text[pos:])
+    return ''.join(parts)
+
+_CYPHER_ESCAPE = str.maketrans({'"': '\\"', '\\': '\\\\', '\n': '\\n', '\r': '\\r', '\t': '\\t'})
+
+def _cypher_literal(value) -> str:
+    """
+    Quoted Cypher string literal; non-string values fall back to their JSON form.
+    """
+    if isinstance(value, str):
+        return '"' + value.translate(_CYPHER_ESCAPE) + '"'
+    return json.dumps(value, ensure_ascii=False)
+
+def _edge_dicts(rel_type: str, edges: List[Tuple[str, str, str]]) -> List[Dict]:
+    return [
+        {'from': from_id, 'to': to_id, 'type': rel_type, 'properties': {'position_id': position_id}}
+        for from_id, to_id, position_id in edges
+    ]
+
+# Infobox values repeat a lot across politicians ('đương nhiệm', common names, ...)
+@lru_cache(maxsize=4096)
+def _extract_text_from_wikilink(text: str) -> str:
+    text = _strip_tags(text)
+    
+    match = _WL_PIPE_RE.search(text)
+    if match:
+        return match.group(2).strip()
+    
+    match = _WL_RE.search(text)
+    if match:
+        return match.group(1).strip()
+    
+    return text.strip()
+
+POLITICIAN_CHUNKSIZE = 128
+
 class SuccessionEdgeBuilder:
     def __init__(self):
         self.politician_name_to_id: Dict[str, str] = {}
         self.position_ids: Set[str] = set()
-        self.succeeded_edges: List[Dict] = []
-        self.preceded_edges: List[Dict] = []
+        # Edges as (from_id, to_id, position_id) tuples; dicts are only built for serialization
+        self.succeeded: List[Tuple[str, str, str]] = []
+        self.preceded: List[Tuple[str, str, str]] = []
         
         self.ignore_values = [
             'chức vụ kết thúc', 
@@ -29,6 +101,19 @@ class SuccessionEdgeBuilder:
             '-',
             ''
         ]
+        self._ignore_set = frozenset(self.ignore_values)
+        
+        # Predecessor/successor names repeat across the dataset (chains of office holders)
+        self._id_cache: Dict[str, Optional[str]] = {}
+        self._names_cache: Dict[str, List[str]] = {}
+    
+    @property
+    def succeeded_edges(self) -> List[Dict]:
+        return _edge_dicts('SUCCEEDED', self.succeeded)
+    
+    @property
+    def preceded_edges(self) -> List[Dict]:
+        return _edge_dicts('PRECEDED', self.preceded)
     
     def _normalize_name(self, name: str) -> str:
         if not name:
@@ -38,53 +123,44 @@ class SuccessionEdgeBuilder:
     def extract_text_from_wikilink(self, text: str) -> str:
         if not text:
             return ""
-        
-        text = re.sub(r'<[^>]+>', '', text)
-        
-        match = re.search(r'\[\[([^|\]]+)\|([^\]]+)\]\]', text)
-        if match:
-            return match.group(2).strip()
-        
-        match = re.search(r'\[\[([^\]]+)\]\]', text)
-        if match:
-            return match.group(1).strip()
-        
-        return text.strip()
+        return _extract_text_from_wikilink(text)
     
     def extract_names_from_wikilink(self, text: str) -> List[str]:
         if not text:
             return []
         
+        names = self._names_cache.get(text)
+        if names is None:
+            names = self._names_cache[text] = self._split_wikilink_names(text)
+        return names
+    
+    def _split_wikilink_names(self, text: str) -> List[str]:
         main_text = self.extract_text_from_wikilink(text)
         
-        names = []
-        for delimiter in [',', ';', '<br>', '<br/>', '\n']:
-            if delimiter in main_text:
-                parts = main_text.split(delimiter)
-                for part in parts:
-                    clean_name = self.extract_text_from_wikilink(part.strip())
-                    if clean_name:
-                        names.append(clean_name)
-                return names
-        
-        if main_text:
-            names.append(main_text)
+        parts = _NAME_SPLIT_RE.split(main_text)
+        if len(parts) == 1:
+            return [main_text] if main_text else []
         
+        names = []
+        for part in parts:
+            clean_name = self.extract_text_from_wikilink(part.strip())
+            if clean_name:
+                names.append(clean_name)
         return names
     
     def load_knowledge_graph(self, kg_file: str):
         log.info(f"Loading knowledge graph from: {kg_file}")
         
-        with open(kg_file, 'r', encoding='utf-8') as f:
-            kg_data = json.load(f)
+        with open(kg_file, 'rb') as f:
+            kg_data = orjson.loads(f.read())
         
         politicians = kg_data.get('nodes', {}).get('Politician', [])
-        for politician in politicians:
-            name = politician.get('name', '')
-            pol_id = politician.get('id', '')
-            if name and pol_id:
-                normalized = self._normalize_name(name)
-                self.politician_name_to_id[normalized] = pol_id
+        self._id_cache.clear()
+        self.politician_name_to_id.update({
+            name.lower().strip(): pol_id
+            for politician in politicians
+            if (name := politician.get('name')) and (pol_id := politician.get('id'))
+        })
         
         positions = kg_data.get('nodes', {}).get('Position', [])
         for position in positions:
@@ -95,99 +171,99 @@ class SuccessionEdgeBuilder:
         return kg_data
     
     def should_ignore(self, value: str) -> bool:
-        if not value:
-            return True
-        normalized = value.lower().strip()
-        return normalized in self.ignore_values
+        return not value or value.lower().strip() in self._ignore_set
     
     def get_politician_id(self, name: str) -> Optional[str]:
-        if not name or self.should_ignore(name):
-            return None
+        try:
+            return self._id_cache[name]
+        except KeyError:
+            pass
         
-        normalized = self._normalize_name(name)
-        return self.politician_name_to_id.get(normalized)
+        if not name or self.should_ignore(name):
+            pol_id = None
+        else:
+            pol_id = self.politician_name_to_id.get(self._normalize_name(name))
+        self._id_cache[name] = pol_id
+        return pol_id
     
     def build_succession_edges_for_politician(self, politician_data: Dict) -> int:
+        succeeded, preceded = self.succession_edges(politician_data)
+        self.succeeded.extend(succeeded)
+        self.preceded.extend(preceded)
+        return len(succeeded) + len(preceded)
+    
+    def succession_edges(self, politician_data: Dict) -> Tuple[List[Tuple[str, str, str]], List[Tuple[str, str, str]]]:
+        """
+        (SUCCEEDED, PRECEDED) edges of one politician; only reads the name index.
+        """
+        succeeded = []
+        preceded = []
+        
         title = politician_data.get('title', '')
         if not title:
-            return 0
+            return succeeded, preceded
         
         source_id = str(politician_data.get('id', '')).strip()
         politician_id = self.get_politician_id(title)
         
         if not politician_id:
-            return 0
+            return succeeded, preceded
         
         infobox = politician_data.get('infobox_normalized', politician_data.get('infobox', {}))
-        edges_created = 0
         
-        for i in range(1, 15):
-            office_key = 'office' if i == 1 else f'office{i}'
+        for office_key, predecessor_key, successor_key, index in _OFFICE_KEYS:
             office = infobox.get(office_key, '')
             
             if not office:
                 continue
-
-            predecessor_key = 'predecessor' if i == 1 else f'predecessor{i}'
-            successor_key = 'successor' if i == 1 else f'successor{i}'
             
             predecessor = infobox.get(predecessor_key, '')
             successor = infobox.get(successor_key, '')
+            if not predecessor and not successor:
+                continue
 
-            position_id = f"pos{source_id}_{str(i).zfill(3)}"
+            position_id = f"pos{source_id}_{index}"
             
             if predecessor and not self.should_ignore(predecessor):
                 predecessor_names = self.extract_names_from_wikilink(predecessor)
                 for pred_name in predecessor_names:
                     pred_id = self.get_politician_id(pred_name)
                     if pred_id:
-                        edge = {
-                            'from': politician_id,
-                            'to': pred_id,
-                            'type': 'SUCCEEDED',
-                            'properties': {
-                                'position_id': position_id
-                            }
-                        }
-                        self.succeeded_edges.append(edge)
-                        edges_created += 1
+                        succeeded.append((politician_id, pred_id, position_id))
             
             if successor and not self.should_ignore(successor):
                 successor_names = self.extract_names_from_wikilink(successor)
                 for succ_name in successor_names:
                     succ_id = self.get_politician_id(succ_name)
                     if succ_id:
-                        edge = {
-                            'from': politician_id,
-                            'to': succ_id,
-                            'type': 'PRECEDED',
-                            'properties': {
-                                'position_id': position_id
-                            }
-                        }
-                        self.preceded_edges.append(edge)
-                        edges_created += 1
+                        preceded.append((politician_id, succ_id, position_id))
         
-        return edges_created
+        return succeeded, preceded
     
-    def build_from_file(self, politicians_file: str, kg_file: str):
+    def build_from_file(self, politicians_file: str, kg_file: str, max_workers: Optional[int] = None):
         log.info(f"Politicians file: {politicians_file}")
         
         kg_data = self.load_knowledge_graph(kg_file)
         
-        with open(politicians_file, 'r', encoding='utf-8') as f:
-            politicians_data = json.load(f)
+        with open(politicians_file, 'rb') as f:
+            politicians_data = orjson.loads(f.read())
         
         total_politicians = len(politicians_data)
         log.info(f"Processing {total_politicians} politicians...")
         
+        # Politicians are independent; workers get the name index once via the initializer.
+        # map (not unordered) keeps the edge order identical to a sequential run.
         total_edges = 0
-        for idx, politician_data in enumerate(politicians_data, 1):
-            edges_count = self.build_succession_edges_for_politician(politician_data)
-            total_edges += edges_count
-            
-            if idx % 100 == 0:
-                log.info(f"Processed {idx}/{total_politicians} politicians, created {total_edges} edges")
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                 initargs=(self.politician_name_to_id,)) as executor:
+            results = executor.map(_worker_succession_edges, politicians_data, chunksize=POLITICIAN_CHUNKSIZE)
+            for idx, (succeeded, preceded) in enumerate(results, 1):
+                self.succeeded.extend(succeeded)
+                self.preceded.extend(preceded)
+                total_edges += len(succeeded) + len(preceded)
+                
+                if idx % 100 == 0:
+                    log.info(f"Processed {idx}/{total_politicians} politicians, created {total_edges} edges")
         
         log.info(f"\nCompleted processing all politicians")
         return kg_data
@@ -205,8 +281,8 @@ class SuccessionEdgeBuilder:
             kg_data['metadata']['updated_at'] = datetime.now().isoformat()
             kg_data['metadata']['total_edges'] = sum(len(edges) for edges in kg_data['edges'].values())
         
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(kg_data, f, ensure_ascii=False, indent=2)
+        with open(output_file, 'wb') as f:
+            f.write(orjson.dumps(kg_data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
         
         log.info(f"Updated knowledge graph: {output_file}")
 
@@ -214,52 +290,42 @@ class SuccessionEdgeBuilder:
     def export_succession_to_cypher(self, output_file: str):
         log.info(f"\nExporting succession edges to Cypher: {output_file}")
         
-        cypher_statements = []
-        cypher_statements.append("// Neo4j Cypher Script - Succession Edges")
-        cypher_statements.append(f"// Generated at: {datetime.now().isoformat()}")
-        cypher_statements.append(f"// Total SUCCEEDED edges: {len(self.succeeded_edges)}")
-        cypher_statements.append(f"// Total PRECEDED edges: {len(self.preceded_edges)}")
-        cypher_statements.append("")
-        
-        if self.succeeded_edges:
-            cypher_statements.append("// Create SUCCEEDED relationships")
-            for edge in self.succeeded_edges:
-                from_id = json.dumps(edge['from'])
-                to_id = json.dumps(edge['to'])
-                
-                props = edge.get('properties', {})
-                if props:
-                    props_str = ', '.join([f"{k}: {json.dumps(v, ensure_ascii=False)}" for k, v in props.items() if v])
-                    props_formatted = f" {{{props_str}}}" if props_str else ""
-                else:
-                    props_formatted = ""
-                
-                cypher_statements.append(
-                    f"MATCH (a:Politician {{id: {from_id}}}), (b:Politician {{id: {to_id}}}) "
-                    f"MERGE (a)-[:SUCCEEDED{props_formatted}]->(b);"
-                )
-        
-        if self.preceded_edges:
-            cypher_statements.append("")
-            cypher_statements.append("// Create PRECEDED relationships")
-            for edge in self.preceded_edges:
-                from_id = json.dumps(edge['from'])
-                to_id = json.dumps(edge['to'])
-                
-                props = edge.get('properties', {})
-                if props:
-                    props_str = ', '.join([f"{k}: {json.dumps(v, ensure_ascii=False)}" for k, v in props.items() if v])
-                    props_formatted = f" {{{props_str}}}" if props_str else ""
-                else:
-                    props_formatted = ""
-                
-                cypher_statements.append(
-                    f"MATCH (a:Politician {{id: {from_id}}}), (b:Politician {{id: {to_id}}}) "
-                    f"MERGE (a)-[:PRECEDED{props_formatted}]->(b);"
-                )
-        
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write('\n'.join(cypher_statements))
+        with open(output_file, 'w', encoding='utf-8', buffering=1 << 20) as f:
+            f.write("// Neo4j Cypher Script - Succession Edges")
+            f.write(f"\n// Generated at: {datetime.now().isoformat()}")
+            f.write(f"\n// Total SUCCEEDED edges: {len(self.succeeded)}")
+            f.write(f"\n// Total PRECEDED edges: {len(self.preceded)}")
+            f.write("\n")
+            
+            if self.succeeded:
+                f.write("\n// Create SUCCEEDED relationships")
+                self._write_cypher_edges(f, 'SUCCEEDED', self.succeeded)
+            
+            if self.preceded:
+                f.write("\n")
+                f.write("\n// Create PRECEDED relationships")
+                self._write_cypher_edges(f, 'PRECEDED', self.preceded)
+    
+    def _write_cypher_edges(self, f, rel_type: str, edges: List[Tuple[str, str, str]]):
+        for from_id, to_id, position_id in edges:
+            props_formatted = f" {{position_id: {_cypher_literal(position_id)}}}" if position_id else ""
+            
+            f.write(
+                f"\nMATCH (a:Politician {{id: {_cypher_literal(from_id)}}}), "
+                f"(b:Politician {{id: {_cypher_literal(to_id)}}}) "
+                f"MERGE (a)-[:{rel_type}{props_formatted}]->(b);"
+            )
+
+# Per-process builder used by build_from_file's worker pool
+_worker_builder = None
+
+def _init_worker(politician_name_to_id: Dict[str, str]):
+    global _worker_builder
+    _worker_builder = SuccessionEdgeBuilder()
+    _worker_builder.politician_name_to_id = politician_name_to_id
+
+def _worker_succession_edges(politician_data: Dict):
+    return _worker_builder.succession_edges(politician_data)
 
 if __name__ == '__main__':
     base_dir = Path(__file__).parent.parent
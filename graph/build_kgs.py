@@ -1,10 +1,16 @@
 # ./graph/build_kgs.py
 
+import os
 import json
 import re
+import ijson
+import orjson
 
-from collections import defaultdict
-from typing import List, Dict, Set, Tuple
+from functools import lru_cache
+from itertools import chain, islice
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Set, Tuple, Optional, Iterator
 from datetime import datetime
 
 from utils.config import settings
@@ -12,62 +18,226 @@ from utils.queue_based_async_logger import get_async_logger
 
 log = get_async_logger("build_kgs", log_file="logs/graph/build_kgs.log")
 
+# Wikitext cleanup patterns, compiled once instead of on every extract_* call.
+# Everything that is simply deleted (templates, refs, image sizes and layout words, file
+# links, URLs, HTML tags) is one alternation, so the text is scanned once instead of seven times;
+# refs come before the generic tag pattern so a whole <ref>...</ref> is dropped.
+_RE_STRIP = re.compile(
+    r'\{\{[^}]+\}\}'
+    r'|<ref[^>]*>.*?</ref>'
+    r'|\b\d+(?:x\d+)?px\b\s*'
+    r'|\b(?:border|thumb|link|frameless|upright|center|left|right|none)\b\s*'
+    r'|\[\[(?:Tập[_ ]?tin|Tập tin|File|Image|Hình):[^\]]+\]\]'
+    r'|https?://[^\s\]]+'
+    r'|<[^>]+>',
+    re.IGNORECASE | re.DOTALL
+)
+_RE_WIKILINK = re.compile(r'\[\[([^\]]+)\]\]')
+_RE_WS = re.compile(r'\s+')
+_RE_SERVICE_YEARS = re.compile(r'(\d{4})\s*[-–—]\s*(\d{4}|nay|present|hiện tại)', re.IGNORECASE)
+_ONGOING_YEAR_END = frozenset(('nay', 'present', 'hiện tại'))
+_RE_BR = re.compile(r'<br\s*/?>', re.IGNORECASE)
+
+# Infobox keys for up to 14 offices: (office, term_start, term_end, predecessor, successor)
+_OFFICE_KEY_TUPLES = [('office', 'term_start', 'term_end', 'predecessor', 'successor')] + [
+    (f'office{i}', f'term_start{i}', f'term_end{i}', f'predecessor{i}', f'successor{i}')
+    for i in range(2, 15)
+]
+
+# Link targets that are not people (namespaces, placeholders for "nobody")
+_EXCLUDE_NAME_KEYWORDS = (
+    'tập tin:', 'file:', 'hình:', 'image:',
+    'thể loại:', 'category:',
+    'wikipedia:', 'wp:',
+    'template:', 'mẫu:',
+    'đầu tiên', 'first', 'none', 'vacant',
+    'không có', 'chưa có', 'mới thành lập',
+    'position established', 'office established'
+)
+# One alternation scans a name once instead of once per keyword
+_RE_EXCLUDE_NAME = re.compile('|'.join(map(re.escape, _EXCLUDE_NAME_KEYWORDS)))
+_EXCLUDE_NAMES = frozenset(["''đầu tiên''", "''cuối cùng''"])
+
+# Office status keywords; dismissal wins over relief wherever either appears in the text,
+# so the two classes stay separate patterns rather than one leftmost-match alternation
+_RE_DISMISSED = re.compile(
+    'cách chức|khai trừ|bị xóa|thôi chức|truất phế|phế truất|tước bỏ|sa thải|kỷ luật cách chức|đuổi việc'
+)
+_RE_RELIEVED = re.compile('miễn nhiệm|bãi nhiệm|bãi bỏ|thôi việc|từ chức|nghỉ việc')
+
+_FILE_PREFIXES = ('file:', 'image:', 'tập tin:', 'hình:')
+
+def _replace_wikilink(match) -> str:
+    """
+    [[target|label]] -> label, [[target]] -> target, file/image links -> ''.
+    """
+    content = match.group(1)
+    content_lower = content.lower()
+    if any(prefix in content_lower for prefix in _FILE_PREFIXES):
+        return ''
+    return content.rpartition('|')[2].strip()
+
+def _extract_text_impl(text: str) -> str:
+    text = _RE_STRIP.sub('', text)
+    text = _RE_WIKILINK.sub(_replace_wikilink, text)
+    text = _RE_WS.sub(' ', text).strip()
+    text = text.replace("''", '').replace('||', '').strip()
+    
+    return text
+
+def _extract_names_impl(text: str) -> Tuple[str, ...]:
+    names = []
+    matches = _RE_WIKILINK.findall(text)
+    
+    for match in matches:
+        if '|' in match:
+            name = match.split('|')[0].strip()
+        else:
+            name = match.strip()
+        
+        name_lower = name.lower()
+        if name and not _RE_EXCLUDE_NAME.search(name_lower):
+            if name_lower not in _EXCLUDE_NAMES:
+                names.append(name)
+    
+    return tuple(names)
+
+# Infobox values (parties, offices, places, predecessor names) repeat across politicians.
+# Plain dict memos so build_from_file can merge the results scrubbed by its workers;
+# they only live for one build_from_file call.
+_TEXT_MEMO: Dict[str, str] = {}
+_NAMES_MEMO: Dict[str, Tuple[str, ...]] = {}
+
+def _extract_text_cached(text: str) -> str:
+    result = _TEXT_MEMO.get(text)
+    if result is None:
+        result = _TEXT_MEMO[text] = _extract_text_impl(text)
+    return result
+
+def _extract_names_cached(text: str) -> Tuple[str, ...]:
+    result = _NAMES_MEMO.get(text)
+    if result is None:
+        result = _NAMES_MEMO[text] = _extract_names_impl(text)
+    return result
+
+@lru_cache(maxsize=65536)
+def _normalize_cached(name: str) -> str:
+    return ' '.join(name.lower().split())
+
+# Node ids recur in every edge statement touching the node, so their literals are built once
+@lru_cache(maxsize=None)
+def _cypher_id(node_id: str) -> str:
+    return json.dumps(node_id, ensure_ascii=False)
+
+# A quote right after "{" or a space can only open a key: quotes inside JSON strings are escaped
+_RE_CYPHER_MAP_KEY = re.compile(r'(?<=[{ ])"(\w+)":')
+
+def _cypher_map(props: Dict) -> str:
+    # One json.dumps for the whole map, then unquote the keys since Cypher map keys are bare
+    return _RE_CYPHER_MAP_KEY.sub(r'\1:', json.dumps(props, ensure_ascii=False))
+
+POLITICIAN_SHARD_SIZE = 256
+
+# Infobox fields read by process_politician
+_AWARD_FIELDS = ('awards', 'giải_thưởng', 'khen_thưởng')
+_MILITARY_FIELDS = ('branch',)
+_ALMA_MATER_FIELDS = ('alma_mater', 'trường', 'nơi_đào_tạo')
+
+NODE_TYPES = (
+    'Politician',
+    'Position',
+    'Location',
+    'Award',
+    'MilitaryCareer',
+    'MilitaryRank',
+    'Campaigns',
+    'AlmaMater',
+    'AcademicTitle',
+)
+
+EDGE_TYPES = (
+    'SERVED_AS',
+    'SUCCEEDED',
+    'PRECEDED',
+    'BORN_AT',
+    'DIED_AT',
+    'AWARDED',
+    'SERVED_IN',
+    'HAS_RANK',  # Politician -> MilitaryRank
+    'FOUGHT_IN',  # Politician -> Campaigns
+    'ALUMNUS_OF',
+    'HAS_ACADEMIC_TITLE',
+)
+
+# (type, from label, to label, export properties) for each edge type in the Cypher script
+RELATIONSHIP_CONFIGS = (
+    ('SERVED_AS', 'Politician', 'Position', True),
+    ('SUCCEEDED', 'Politician', 'Politician', True),
+    ('PRECEDED', 'Politician', 'Politician', True),
+    ('BORN_AT', 'Politician', 'Location', False),
+    ('DIED_AT', 'Politician', 'Location', False),
+    ('AWARDED', 'Politician', 'Award', False),
+    ('SERVED_IN', 'Politician', 'MilitaryCareer', True),
+    ('HAS_RANK', 'Politician', 'MilitaryRank', False),
+    ('FOUGHT_IN', 'Politician', 'Campaigns', False),
+    ('ALUMNUS_OF', 'Politician', 'AlmaMater', False),
+    ('HAS_ACADEMIC_TITLE', 'Politician', 'AcademicTitle', False),
+)
+
 class KnowledgeGraphBuilder:
     def __init__(self):
-        self.nodes = {
-            'Politician': [],
-            'Position': [],
-            'Location': [],
-            'Award': [],
-            'MilitaryCareer': [],
-            'MilitaryRank': [],
-            'Campaigns': [],
-            'AlmaMater': [],
-            'AcademicTitle': [],
-        }
+        self.nodes = {node_type: [] for node_type in NODE_TYPES}
         
-        self.edges = {
-            'SERVED_AS': [],
-            'SUCCEEDED': [],
-            'PRECEDED': [],
-            'BORN_AT': [],
-            'DIED_AT': [],
-            'AWARDED': [],
-            'SERVED_IN': [],
-            'HAS_RANK': [],  # Politician -> MilitaryRank
-            'FOUGHT_IN': [],  # Politician -> Campaigns
-            'ALUMNUS_OF': [],
-            'HAS_ACADEMIC_TITLE': []
-        }
+        # Edges are stored column-wise per type; properties is None when empty
+        self.edges_from = {rel_type: [] for rel_type in EDGE_TYPES}
+        self.edges_to = {rel_type: [] for rel_type in EDGE_TYPES}
+        self.edges_props = {rel_type: [] for rel_type in EDGE_TYPES}
         
-        self.unique_politicians = set()
-        self.unique_positions = set()
-        self.unique_locations = set()
-        self.unique_awards = set()
-        self.unique_military_careers = set()
-        self.unique_military_ranks = set()
-        self.unique_campaigns = set()
-        self.unique_alma_maters = set()
-        self.unique_academic_titles = set()
-        
-        self.node_id_map = {
-            'Politician': {},
-            'Position': {},
-            'Location': {},
-            'Award': {},
-            'MilitaryCareer': {},
-            'MilitaryRank': {},
-            'Campaigns': {},
-            'AlmaMater': {},
-            'AcademicTitle': {},
-        }
+        self.node_id_map = {node_type: {} for node_type in NODE_TYPES}
         self.node_counters = defaultdict(int)
         self.generated_node_ids: Set[str] = set()
     
+    # Unique entity names per type, keyed by normalized name
+    @property
+    def unique_politicians(self):
+        return self.node_id_map['Politician'].keys()
+
+    @property
+    def unique_positions(self):
+        return self.node_id_map['Position'].keys()
+
+    @property
+    def unique_locations(self):
+        return self.node_id_map['Location'].keys()
+
+    @property
+    def unique_awards(self):
+        return self.node_id_map['Award'].keys()
+
+    @property
+    def unique_military_careers(self):
+        return self.node_id_map['MilitaryCareer'].keys()
+
+    @property
+    def unique_military_ranks(self):
+        return self.node_id_map['MilitaryRank'].keys()
+
+    @property
+    def unique_campaigns(self):
+        return self.node_id_map['Campaigns'].keys()
+
+    @property
+    def unique_alma_maters(self):
+        return self.node_id_map['AlmaMater'].keys()
+
+    @property
+    def unique_academic_titles(self):
+        return self.node_id_map['AcademicTitle'].keys()
+
     def _normalize_name(self, name: str) -> str:
         if not name or not isinstance(name, str):
             return ""
-        return ' '.join(name.lower().split())
+        return _normalize_cached(name)
     
     def _extract_id_segment(self, source_id: str) -> str:
         source_str = str(source_id or '').strip()
@@ -76,81 +246,36 @@ class KnowledgeGraphBuilder:
         return source_str
 
     def _generate_node_id(self, node_type: str, source_id: str) -> str:
-        prefix = node_type[:3].lower()
         segment = self._extract_id_segment(source_id)
-        base_key = f"{node_type}:{segment}"
-        if node_type == 'Politician':
-            candidate = f"{prefix}{segment}"
-            if candidate in self.generated_node_ids:
-                self.node_counters[base_key] += 1
-                candidate = f"{prefix}{segment}_{self.node_counters[base_key]:03d}"
-        else:
-            self.node_counters[base_key] += 1
-            candidate = f"{prefix}{segment}_{self.node_counters[base_key]:03d}"
+        stem = node_type[:3].lower() + segment
+        generated = self.generated_node_ids
+        if node_type == 'Politician' and stem not in generated:
+            generated.add(stem)
+            return stem
 
-        while candidate in self.generated_node_ids:
-            self.node_counters[base_key] += 1
-            candidate = f"{prefix}{segment}_{self.node_counters[base_key]:03d}"
+        # MilitaryCareer and MilitaryRank share the 'mil' prefix and a segment such as
+        # '12_001' can equal a numbered id of segment '12', so collisions stay possible
+        counters = self.node_counters
+        base_key = (node_type, segment)
+        count = counters[base_key] + 1
+        candidate = f"{stem}_{count:03d}"
+        while candidate in generated:
+            count += 1
+            candidate = f"{stem}_{count:03d}"
+        counters[base_key] = count
 
-        self.generated_node_ids.add(candidate)
+        generated.add(candidate)
         return candidate
 
     def extract_text_from_wikilink(self, text: str) -> str:
         if not text or not isinstance(text, str):
             return ""
-        
-        text = re.sub(r'\{\{[^}]+\}\}', '', text)
-        text = re.sub(r'<ref[^>]*>.*?</ref>', '', text, flags=re.DOTALL)
-        text = re.sub(r'\b\d+(?:x\d+)?px\b\s*', '', text, flags=re.IGNORECASE)
-        text = re.sub(r'\b(?:border|thumb|link|frameless|upright|center|left|right|none)\b\s*', '', text, flags=re.IGNORECASE)
-        text = re.sub(r'\[\[(?:Tập[_ ]?tin|Tập tin|File|Image|Hình):[^\]]+\]\]', '', text, flags=re.IGNORECASE)
-        text = re.sub(r'https?://[^\s\]]+', '', text, flags=re.IGNORECASE)
-
-        def replace_wikilink(match):
-            content = match.group(1)
-            if any(prefix in content.lower() for prefix in ['file:', 'image:', 'tập tin:', 'hình:']):
-                return ''
-            if '|' in content:
-                return content.split('|')[-1].strip()
-            return content.strip()
-        
-        text = re.sub(r'\[\[([^\]]+)\]\]', replace_wikilink, text)
-        text = re.sub(r'<[^>]+>', '', text)
-        text = re.sub(r'\s+', ' ', text).strip()
-        text = text.replace("''", '').replace('||', '').strip()
-        
-        return text
+        return _extract_text_cached(text)
     
     def extract_names_from_wikilink(self, text: str) -> List[str]:
         if not text or not isinstance(text, str):
             return []
-        
-        names = []
-        pattern = r'\[\[([^\]]+)\]\]'
-        matches = re.findall(pattern, text)
-        
-        for match in matches:
-            if '|' in match:
-                name = match.split('|')[0].strip()
-            else:
-                name = match.strip()
-            
-            exclude_keywords = [
-                'tập tin:', 'file:', 'hình:', 'image:',
-                'thể loại:', 'category:',
-                'wikipedia:', 'wp:',
-                'template:', 'mẫu:',
-                'đầu tiên', 'first', 'none', 'vacant',
-                'không có', 'chưa có', 'mới thành lập',
-                'position established', 'office established'
-            ]
-            
-            name_lower = name.lower()
-            if name and not any(ex in name_lower for ex in exclude_keywords):
-                if name_lower not in ["''đầu tiên''", "''cuối cùng''"]:
-                    names.append(name)
-        
-        return names
+        return list(_extract_names_cached(text))
     
     def detect_status_from_office(self, office_text: str) -> str:
         if not office_text:
@@ -158,24 +283,10 @@ class KnowledgeGraphBuilder:
         
         office_lower = office_text.lower()
         
-        dismissed_keywords = [
-            'cách chức', 'khai trừ', 'bị xóa', 'thôi chức',
-            'truất phế', 'phế truất', 'tước bỏ', 'sa thải',
-            'kỷ luật cách chức', 'đuổi việc'
-        ]
-        
-        relieved_keywords = [
-            'miễn nhiệm', 'bãi nhiệm', 'bãi bỏ',
-            'thôi việc', 'từ chức', 'nghỉ việc'
-        ]
-        
-        for keyword in dismissed_keywords:
-            if keyword in office_lower:
-                return 'bị cách chức'
-        
-        for keyword in relieved_keywords:
-            if keyword in office_lower:
-                return 'miễn nhiệm'
+        if _RE_DISMISSED.search(office_lower):
+            return 'bị cách chức'
+        if _RE_RELIEVED.search(office_lower):
+            return 'miễn nhiệm'
         return ''
     
     def add_politician_node(self, politician_data: Dict) -> str:
@@ -204,334 +315,151 @@ class KnowledgeGraphBuilder:
         }
         
         self.nodes['Politician'].append(node)
-        self.unique_politicians.add(title)
         self.node_id_map['Politician'][normalized] = node_id  
         return node_id
     
-    def add_position_node(self, position_text: str, source_id: str) -> str:
-        position = self.extract_text_from_wikilink(position_text)
-        if not position:
+    def _add_simple_node(self, node_type: str, text: str, source_id: str) -> str:
+        name = self.extract_text_from_wikilink(text)
+        if not name:
             return ""
         
-        normalized = self._normalize_name(position)
-        existing_id = self.node_id_map['Position'].get(normalized)
+        normalized = _normalize_cached(name)
+        id_map = self.node_id_map[node_type]
+        existing_id = id_map.get(normalized)
         if existing_id:
             return existing_id
         
-        node_id = self._generate_node_id('Position', source_id)
+        node_id = self._generate_node_id(node_type, source_id)
         
         node = {
             'id': node_id,
-            'type': 'Position',
-            'name': position
+            'type': node_type,
+            'name': name
         }
         
-        self.nodes['Position'].append(node)
-        self.unique_positions.add(position)
-        self.node_id_map['Position'][normalized] = node_id  
+        self.nodes[node_type].append(node)
+        id_map[normalized] = node_id
         return node_id
     
+    def add_position_node(self, position_text: str, source_id: str) -> str:
+        return self._add_simple_node('Position', position_text, source_id)
+    
     def add_location_node(self, location_text: str, source_id: str) -> str:
-        location = self.extract_text_from_wikilink(location_text)
-        if not location:
-            return ""
-        
-        normalized = self._normalize_name(location)
-        existing_id = self.node_id_map['Location'].get(normalized)
-        if existing_id:
-            return existing_id
-        
-        node_id = self._generate_node_id('Location', source_id)
-        
-        node = {
-            'id': node_id,
-            'type': 'Location',
-            'name': location
-        }
-        
-        self.nodes['Location'].append(node)
-        self.unique_locations.add(location)
-        self.node_id_map['Location'][normalized] = node_id  
-        return node_id
+        return self._add_simple_node('Location', location_text, source_id)
     
     def add_award_node(self, award_text: str, source_id: str) -> str:
-        award = self.extract_text_from_wikilink(award_text)
-        if not award:
-            return ""
-        
-        normalized = self._normalize_name(award)
-        existing_id = self.node_id_map['Award'].get(normalized)
-        if existing_id:
-            return existing_id
-        
-        node_id = self._generate_node_id('Award', source_id)
-        
-        node = {
-            'id': node_id,
-            'type': 'Award',
-            'name': award
-        }
-        
-        self.nodes['Award'].append(node)
-        self.unique_awards.add(award)
-        self.node_id_map['Award'][normalized] = node_id  
-        return node_id
+        return self._add_simple_node('Award', award_text, source_id)
     
     def add_military_career_node(self, military_text: str, source_id: str) -> str:
-        military = self.extract_text_from_wikilink(military_text)
-        if not military:
-            return ""
-        
-        normalized = self._normalize_name(military)
-        
-        existing_id = self.node_id_map['MilitaryCareer'].get(normalized)
-        if existing_id:
-            return existing_id
-        
-        node_id = self._generate_node_id('MilitaryCareer', source_id)
-        
-        node = {
-            'id': node_id,
-            'type': 'MilitaryCareer',
-            'name': military
-        }
-        
-        self.nodes['MilitaryCareer'].append(node)
-        self.unique_military_careers.add(military)
-        self.node_id_map['MilitaryCareer'][normalized] = node_id  
-        return node_id
+        return self._add_simple_node('MilitaryCareer', military_text, source_id)
     
     def add_military_rank_node(self, rank_text: str, source_id: str) -> str:
-        rank = self.extract_text_from_wikilink(rank_text)
-        if not rank:
-            return ""
-        
-        normalized = self._normalize_name(rank)
-        existing_id = self.node_id_map['MilitaryRank'].get(normalized)
-        if existing_id:
-            return existing_id
-        
-        node_id = self._generate_node_id('MilitaryRank', source_id)
-        
-        node = {
-            'id': node_id,
-            'type': 'MilitaryRank',
-            'name': rank
-        }
-        
-        self.nodes['MilitaryRank'].append(node)
-        self.unique_military_ranks.add(rank)
-        self.node_id_map['MilitaryRank'][normalized] = node_id  
-        return node_id
+        return self._add_simple_node('MilitaryRank', rank_text, source_id)
     
     def add_campaign_node(self, campaign_text: str, source_id: str) -> str:
-        campaign = self.extract_text_from_wikilink(campaign_text)
-        if not campaign:
-            return ""
-        
-        normalized = self._normalize_name(campaign)
-        existing_id = self.node_id_map['Campaigns'].get(normalized)
-        if existing_id:
-            return existing_id
-        
-        node_id = self._generate_node_id('Campaigns', source_id)
-        
-        node = {
-            'id': node_id,
-            'type': 'Campaigns',
-            'name': campaign
+        return self._add_simple_node('Campaigns', campaign_text, source_id)
+    
+    def _add_edge(self, rel_type: str, from_id: str, to_id: str, properties: Dict = None):
+        self.edges_from[rel_type].append(from_id)
+        self.edges_to[rel_type].append(to_id)
+        self.edges_props[rel_type].append(properties or None)
+    
+    def _add_edges(self, rel_type: str, from_id: str, to_ids: List[str], properties: Dict = None):
+        if not to_ids:
+            return
+        count = len(to_ids)
+        self.edges_from[rel_type].extend([from_id] * count)
+        self.edges_to[rel_type].extend(to_ids)
+        self.edges_props[rel_type].extend([properties or None] * count)
+    
+    def _iter_edges(self, rel_type: str):
+        return zip(self.edges_from[rel_type], self.edges_to[rel_type], self.edges_props[rel_type])
+    
+    @property
+    def edges(self) -> Dict[str, List[Dict]]:
+        return {
+            rel_type: [
+                {'from': from_id, 'to': to_id, 'type': rel_type, 'properties': properties or {}}
+                for from_id, to_id, properties in self._iter_edges(rel_type)
+            ]
+            for rel_type in EDGE_TYPES
         }
-        
-        self.nodes['Campaigns'].append(node)
-        self.unique_campaigns.add(campaign)
-        self.node_id_map['Campaigns'][normalized] = node_id  
-        return node_id
     
     def add_served_as_edge(self, politician_id: str, position_id: str, properties: Dict = None):
         if not politician_id or not position_id:
             return
         
-        edge = {
-            'from': politician_id,
-            'to': position_id,
-            'type': 'SERVED_AS',
-            'properties': properties or {}
-        }
-        
-        self.edges['SERVED_AS'].append(edge)
+        self._add_edge('SERVED_AS', politician_id, position_id, properties)
     
     def add_succession_edges(self, politician_id: str, successor: str, predecessor: str, position_id: str = None):
+        succession_props = {'position_id': position_id} if position_id else None
+        politician_id_get = self.node_id_map['Politician'].get
+        
         if predecessor:
-            predecessor_names = self.extract_names_from_wikilink(predecessor)
-            for pred_name in predecessor_names:
-                normalized = self._normalize_name(pred_name)
-                target_id = self.node_id_map['Politician'].get(normalized)
-                if target_id:
-                    properties = {}
-                    if position_id:
-                        properties['position_id'] = position_id
-                    edge = {
-                        'from': politician_id,
-                        'to': target_id,
-                        'type': 'SUCCEEDED',
-                        'properties': properties
-                    }
-                    self.edges['SUCCEEDED'].append(edge)
+            target_ids = [
+                target_id
+                for target_id in map(politician_id_get, map(_normalize_cached, self.extract_names_from_wikilink(predecessor)))
+                if target_id
+            ]
+            self._add_edges('SUCCEEDED', politician_id, target_ids, succession_props)
         
         if successor:
-            successor_names = self.extract_names_from_wikilink(successor)
-            for succ_name in successor_names:
-                normalized = self._normalize_name(succ_name)
-                target_id = self.node_id_map['Politician'].get(normalized)
-                if target_id: 
-                    properties = {}
-                    if position_id:
-                        properties['position_id'] = position_id
-                    edge = {
-                        'from': politician_id,
-                        'to': target_id,
-                        'type': 'PRECEDED',
-                        'properties': properties
-                    }
-                    self.edges['PRECEDED'].append(edge)
+            target_ids = [
+                target_id
+                for target_id in map(politician_id_get, map(_normalize_cached, self.extract_names_from_wikilink(successor)))
+                if target_id
+            ]
+            self._add_edges('PRECEDED', politician_id, target_ids, succession_props)
     
     def add_location_edges(self, politician_id: str, birth_location_id: str, death_location_id: str):
         if birth_location_id:
-            edge = {
-                'from': politician_id,
-                'to': birth_location_id,
-                'type': 'BORN_AT',
-                'properties': {}
-            }
-            self.edges['BORN_AT'].append(edge)
+            self._add_edge('BORN_AT', politician_id, birth_location_id)
         
         if death_location_id:
-            edge = {
-                'from': politician_id,
-                'to': death_location_id,
-                'type': 'DIED_AT',
-                'properties': {}
-            }
-            self.edges['DIED_AT'].append(edge)
+            self._add_edge('DIED_AT', politician_id, death_location_id)
     
     def add_award_edge(self, politician_id: str, award_id: str):
         if not award_id:
             return
 
-        edge = {
-            'from': politician_id,
-            'to': award_id,
-            'type': 'AWARDED',
-            'properties': {}
-        }
-        self.edges['AWARDED'].append(edge)
+        self._add_edge('AWARDED', politician_id, award_id)
     
     def add_military_edge(self, politician_id: str, military_id: str, properties: Dict = None):
         if not military_id:
             return
 
-        edge = {
-            'from': politician_id,
-            'to': military_id,
-            'type': 'SERVED_IN',
-            'properties': properties or {}
-        }
-        self.edges['SERVED_IN'].append(edge)
+        self._add_edge('SERVED_IN', politician_id, military_id, properties)
     
     def add_has_rank_edge(self, politician_id: str, rank_id: str):
         if not rank_id:
             return
         
-        edge = {
-            'from': politician_id,
-            'to': rank_id,
-            'type': 'HAS_RANK',
-            'properties': {}
-        }
-        self.edges['HAS_RANK'].append(edge)
+        self._add_edge('HAS_RANK', politician_id, rank_id)
     
     def add_fought_in_edge(self, politician_id: str, campaign_id: str):
         if not campaign_id:
             return
         
-        edge = {
-            'from': politician_id,
-            'to': campaign_id,
-            'type': 'FOUGHT_IN',
-            'properties': {}
-        }
-        self.edges['FOUGHT_IN'].append(edge)
+        self._add_edge('FOUGHT_IN', politician_id, campaign_id)
     
     def add_alma_mater_node(self, alma_mater_text: str, source_id: str) -> str:
-        alma_mater = self.extract_text_from_wikilink(alma_mater_text)
-        if not alma_mater:
-            return ""
-        
-        normalized = self._normalize_name(alma_mater)
-        existing_id = self.node_id_map['AlmaMater'].get(normalized)
-        if existing_id:
-            return existing_id
-        
-        node_id = self._generate_node_id('AlmaMater', source_id)
-        
-        node = {
-            'id': node_id,
-            'type': 'AlmaMater',
-            'name': alma_mater
-        }
-        
-        self.nodes['AlmaMater'].append(node)
-        self.unique_alma_maters.add(alma_mater)
-        self.node_id_map['AlmaMater'][normalized] = node_id  
-        return node_id
+        return self._add_simple_node('AlmaMater', alma_mater_text, source_id)
     
     def add_academic_title_node(self, title_text: str, source_id: str) -> str:
-        title = self.extract_text_from_wikilink(title_text)
-        if not title:
-            return ""
-        
-        normalized = self._normalize_name(title)
-        existing_id = self.node_id_map['AcademicTitle'].get(normalized)
-        if existing_id:
-            return existing_id
-        
-        node_id = self._generate_node_id('AcademicTitle', source_id)
-        
-        node = {
-            'id': node_id,
-            'type': 'AcademicTitle',
-            'name': title  
-        }
-        
-        self.nodes['AcademicTitle'].append(node)
-        self.unique_academic_titles.add(title)
-        self.node_id_map['AcademicTitle'][normalized] = node_id  
-        return node_id
+        return self._add_simple_node('AcademicTitle', title_text, source_id)
     
     
     def add_alumnus_of_edge(self, politician_id: str, alma_mater_id: str):
         if not alma_mater_id:
             return
         
-        edge = {
-            'from': politician_id,
-            'to': alma_mater_id,
-            'type': 'ALUMNUS_OF',
-            'properties': {}
-        }
-        self.edges['ALUMNUS_OF'].append(edge)
+        self._add_edge('ALUMNUS_OF', politician_id, alma_mater_id)
     
     def add_academic_title_edge(self, politician_id: str, title_id: str):
         if not title_id:
             return
         
-        edge = {
-            'from': politician_id,
-            'to': title_id,
-            'type': 'HAS_ACADEMIC_TITLE',
-            'properties': {}
-        }
-        self.edges['HAS_ACADEMIC_TITLE'].append(edge)
+        self._add_edge('HAS_ACADEMIC_TITLE', politician_id, title_id)
 
     def resolve_politician_edges(self):
         pass
@@ -546,38 +474,45 @@ class KnowledgeGraphBuilder:
             return
 
         infobox = politician_data.get('infobox_normalized', politician_data.get('infobox', {}))
+        
+        # Bound once; these are called inside the per-office and per-item loops below
+        extract_text = self.extract_text_from_wikilink
+        add_position = self.add_position_node
+        add_served_as = self.add_served_as_edge
+        add_succession = self.add_succession_edges
+        add_award = self.add_award_node
+        add_award_edge = self.add_award_edge
+        add_campaign = self.add_campaign_node
+        add_fought_in = self.add_fought_in_edge
+        add_alma_mater = self.add_alma_mater_node
+        add_alumnus_of = self.add_alumnus_of_edge
+        add_title = self.add_academic_title_node
+        add_title_edge = self.add_academic_title_edge
 
-        for i in range(1, 15):
-            office_key = 'office' if i == 1 else f'office{i}'
-            office = infobox.get(office_key, '')
-            
-            if office:
-                position_id = self.add_position_node(office, source_id)
-                if position_id:
-                    term_start = self.extract_text_from_wikilink(
-                        infobox.get(f'term_start{i}' if i > 1 else 'term_start', '')
-                    )
-                    term_end = self.extract_text_from_wikilink(
-                        infobox.get(f'term_end{i}' if i > 1 else 'term_end', '')
-                    )
-                    
-                    status = self.detect_status_from_office(office)
-                    
-                    properties = {
-                        'term_start': term_start,
-                        'term_end': term_end,
-                        'status': status
-                    }
-                    
-                    self.add_served_as_edge(politician_id, position_id, properties)
+        for office_key, term_start_key, term_end_key, predecessor_key, successor_key in _OFFICE_KEY_TUPLES:
+            office = infobox.get(office_key)
+            if not office:
+                continue
+
+            position_id = add_position(office, source_id)
+            if position_id:
+                term_start = extract_text(infobox.get(term_start_key, ''))
+                term_end = extract_text(infobox.get(term_end_key, ''))
                 
-                predecessor_key = 'predecessor' if i == 1 else f'predecessor{i}'
-                successor_key = 'successor' if i == 1 else f'successor{i}'
+                status = self.detect_status_from_office(office)
                 
-                predecessor = infobox.get(predecessor_key, '')
-                successor = infobox.get(successor_key, '')
+                properties = {
+                    'term_start': term_start,
+                    'term_end': term_end,
+                    'status': status
+                }
                 
-                self.add_succession_edges(politician_id, successor, predecessor, position_id)
+                add_served_as(politician_id, position_id, properties)
+            
+            predecessor = infobox.get(predecessor_key, '')
+            successor = infobox.get(successor_key, '')
+            
+            add_succession(politician_id, successor, predecessor, position_id)
         
         birth_place = infobox.get('birth_place', infobox.get('nơi_sinh', ''))
         death_place = infobox.get('death_place', infobox.get('nơi_chết', ''))
@@ -591,38 +526,35 @@ class KnowledgeGraphBuilder:
         if awards_array:
             for award_item in awards_array:
                 if award_item:
-                    award_id = self.add_award_node(award_item, source_id)
-                    self.add_award_edge(politician_id, award_id)
+                    award_id = add_award(award_item, source_id)
+                    add_award_edge(politician_id, award_id)
         else:
-            award_fields = ['awards', 'giải_thưởng', 'khen_thưởng']
-            for field in award_fields:
+            for field in _AWARD_FIELDS:
                 award_value = infobox.get(field, '')
                 if award_value:
                     if isinstance(award_value, list):
                         for award_item in award_value:
                             if award_item:
-                                award_id = self.add_award_node(award_item, source_id)
-                                self.add_award_edge(politician_id, award_id)
+                                award_id = add_award(award_item, source_id)
+                                add_award_edge(politician_id, award_id)
                     elif isinstance(award_value, str):
-                        award_id = self.add_award_node(award_value, source_id)
-                        self.add_award_edge(politician_id, award_id)
+                        award_id = add_award(award_value, source_id)
+                        add_award_edge(politician_id, award_id)
         
-        military_fields = ['branch']
-        for field in military_fields:
+        for field in _MILITARY_FIELDS:
             military = infobox.get(field, '')
             if military:
-                service_years = self.extract_text_from_wikilink(infobox.get('serviceyears', infobox.get('years_of_service', infobox.get('năm_phục_vụ', ''))))
-                rank = self.extract_text_from_wikilink(infobox.get('rank', infobox.get('military_rank', infobox.get('cấp_bậc', ''))))
+                service_years = extract_text(infobox.get('serviceyears', infobox.get('years_of_service', infobox.get('năm_phục_vụ', ''))))
+                rank = extract_text(infobox.get('rank', infobox.get('military_rank', infobox.get('cấp_bậc', ''))))
                 
                 year_start = ""
                 year_end = ""
                 if service_years:
-                    year_pattern = r'(\d{4})\s*[-–—]\s*(\d{4}|nay|present|hiện tại)'
-                    match = re.search(year_pattern, service_years, re.IGNORECASE)
+                    match = _RE_SERVICE_YEARS.search(service_years)
                     if match:
                         year_start = match.group(1)
                         year_end_raw = match.group(2)
-                        if year_end_raw.lower() not in ['nay', 'present', 'hiện tại']:
+                        if year_end_raw.lower() not in _ONGOING_YEAR_END:
                             year_end = year_end_raw
                 
                 military_id = self.add_military_career_node(military, source_id)
@@ -643,58 +575,93 @@ class KnowledgeGraphBuilder:
         if battles and isinstance(battles, list):
             for battle in battles:
                 if battle:
-                    campaign_id = self.add_campaign_node(battle, source_id)
-                    self.add_fought_in_edge(politician_id, campaign_id)
+                    campaign_id = add_campaign(battle, source_id)
+                    add_fought_in(politician_id, campaign_id)
         
-        alma_mater_fields = ['alma_mater', 'trường', 'nơi_đào_tạo']
-        for field in alma_mater_fields:
+        for field in _ALMA_MATER_FIELDS:
             alma_mater = infobox.get(field, '')
             if alma_mater:
                 if isinstance(alma_mater, list):
                     schools = alma_mater
                 else:
-                    schools = alma_mater.split('<br>')
+                    schools = _RE_BR.split(alma_mater) if '<' in alma_mater else (alma_mater,)
                 
                 for school in schools:
                     if isinstance(school, str):
                         school = school.strip()
                     if school:
-                        alma_mater_id = self.add_alma_mater_node(school, source_id)
-                        self.add_alumnus_of_edge(politician_id, alma_mater_id)
+                        alma_mater_id = add_alma_mater(school, source_id)
+                        add_alumnus_of(politician_id, alma_mater_id)
         
         education_level = infobox.get('education', infobox.get('trình_độ', ''))
         if education_level:
             if isinstance(education_level, list):
                 titles = education_level
             else:
-                titles = education_level.split('<br>')
+                titles = _RE_BR.split(education_level) if '<' in education_level else (education_level,)
             
             for title_text in titles:
                 if isinstance(title_text, str):
                     title_text = title_text.strip()
                 if title_text:
-                    title_id = self.add_academic_title_node(title_text, source_id)
-                    self.add_academic_title_edge(politician_id, title_id)
+                    title_id = add_title(title_text, source_id)
+                    add_title_edge(politician_id, title_id)
         
         honorific_prefix = infobox.get('honorific_prefix', '')
         if honorific_prefix:
-            prefix_parts = honorific_prefix.split(',')
-            for part in prefix_parts:
-                part = part.strip()
-                if part:
-                    title_id = self.add_academic_title_node(part, source_id)
-                    self.add_academic_title_edge(politician_id, title_id)
+            for part in filter(None, (part.strip() for part in honorific_prefix.split(','))):
+                add_title_edge(politician_id, add_title(part, source_id))
     
-    def build_from_file(self, input_file: str):
-        with open(input_file, 'r', encoding='utf-8') as f:
-            politicians_data = json.load(f)
-        
-        log.info(f"Number of politicians: {len(politicians_data)}")
-        
-        for i, politician_data in enumerate(politicians_data, 1):
-            title = politician_data.get('title', 'Unknown')
-            log.info(f"[{i}/{len(politicians_data)}] Processing: {title}")
-            self.process_politician(politician_data)
+    def iter_politicians(self, input_file: str) -> Iterator[Dict]:
+        """
+        Stream politicians from the input JSON array one at a time.
+        """
+        with open(input_file, 'rb') as f:
+            yield from ijson.items(f, 'item', use_float=True)
+    
+    def scrub_in_pool(self, input_file: str, max_workers: Optional[int] = None) -> int:
+        """
+        Run the wikitext scrubbing for every politician across worker processes and merge
+        the results into the extraction memos. Returns the number of politicians read.
+        """
+        workers = max_workers or os.cpu_count() or 1
+        politicians = self.iter_politicians(input_file)
+        shards = iter(lambda: list(islice(politicians, POLITICIAN_SHARD_SIZE)), [])
+        
+        # A single shard is not worth starting the pool for; the build pass scrubs it inline
+        first_shards = list(islice(shards, 2))
+        if len(first_shards) < 2:
+            return sum(len(shard) for shard in first_shards)
+        
+        # Bounded number of shards in flight, so the input is never fully resident
+        total = 0
+        pending = deque()
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for shard in chain(first_shards, shards):
+                total += len(shard)
+                pending.append(executor.submit(_worker_scrub_shard, shard))
+                if len(pending) >= 2 * workers:
+                    _merge_memos(*pending.popleft().result())
+            while pending:
+                _merge_memos(*pending.popleft().result())
+        return total
+    
+    def build_from_file(self, input_file: str, max_workers: Optional[int] = None):
+        # Node ids and succession lookups depend on input order, so the graph itself is built
+        # in a sequential second pass; the workers only run the scrubbing and hand back memos.
+        try:
+            total = self.scrub_in_pool(input_file, max_workers)
+            
+            log.info(f"Number of politicians: {total}")
+            
+            for i, politician_data in enumerate(self.iter_politicians(input_file), 1):
+                title = politician_data.get('title', 'Unknown')
+                log.info(f"[{i}/{total}] Processing: {title}")
+                self.process_politician(politician_data)
+        finally:
+            # Release every memoized infobox string once the build is done
+            _TEXT_MEMO.clear()
+            _NAMES_MEMO.clear()
         
         self.resolve_politician_edges()
     
@@ -706,95 +673,81 @@ class KnowledgeGraphBuilder:
             'metadata': {
                 'created_at': datetime.now().isoformat(),
                 'total_nodes': sum(len(nodes) for nodes in self.nodes.values()),
-                'total_edges': sum(len(edges) for edges in self.edges.values()),
+                'total_edges': sum(len(targets) for targets in self.edges_to.values()),
                 'node_types': list(self.nodes.keys()),
-                'edge_types': list(self.edges.keys())
+                'edge_types': list(EDGE_TYPES)
             },
             'nodes': self.nodes,
             'edges': self.edges
         }
         
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(graph_data, f, ensure_ascii=False, indent=2)
+        with open(output_file, 'wb') as f:
+            f.write(orjson.dumps(graph_data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
         
         log.info(f"Completed!")
     
-    def export_to_neo4j_cypher(self, output_file: str):
-        log.info(f"\nCreating Cypher script: {output_file}")
-        
-        cypher_statements = []
-        
-        cypher_statements.append("// Neo4j Cypher Script - Knowledge Graph Import")
-        cypher_statements.append(f"// Generated at: {datetime.now().isoformat()}")
-        cypher_statements.append("// Clear existing data (optional)")
-        cypher_statements.append("// MATCH (n) DETACH DELETE n;\n")
-        
-        cypher_statements.append("// Create constraints")
-        cypher_statements.append("CREATE CONSTRAINT politician_id IF NOT EXISTS FOR (p:Politician) REQUIRE p.id IS UNIQUE;")
-        cypher_statements.append("CREATE CONSTRAINT position_id IF NOT EXISTS FOR (p:Position) REQUIRE p.id IS UNIQUE;")
-        cypher_statements.append("CREATE CONSTRAINT location_id IF NOT EXISTS FOR (l:Location) REQUIRE l.id IS UNIQUE;")
-        cypher_statements.append("CREATE CONSTRAINT award_id IF NOT EXISTS FOR (a:Award) REQUIRE a.id IS UNIQUE;")
-        cypher_statements.append("CREATE CONSTRAINT military_id IF NOT EXISTS FOR (m:MilitaryCareer) REQUIRE m.id IS UNIQUE;")
-        cypher_statements.append("CREATE CONSTRAINT military_rank_id IF NOT EXISTS FOR (mr:MilitaryRank) REQUIRE mr.id IS UNIQUE;")
-        cypher_statements.append("CREATE CONSTRAINT campaigns_id IF NOT EXISTS FOR (c:Campaigns) REQUIRE c.id IS UNIQUE;")
-        cypher_statements.append("CREATE CONSTRAINT alma_mater_id IF NOT EXISTS FOR (a:AlmaMater) REQUIRE a.id IS UNIQUE;")
-        cypher_statements.append("CREATE CONSTRAINT academic_title_id IF NOT EXISTS FOR (a:AcademicTitle) REQUIRE a.id IS UNIQUE;")
-        
-        # Create nodes for each type
-        node_types_mapping = {
-            'Politician': 'Politician',
-            'Position': 'Position',
-            'Location': 'Location',
-            'Award': 'Award',
-            'MilitaryCareer': 'MilitaryCareer',
-            'MilitaryRank': 'MilitaryRank',
-            'Campaigns': 'Campaigns',
-            'AlmaMater': 'AlmaMater',
-            'AcademicTitle': 'AcademicTitle',
-        }
-        
-        for node_type, label in node_types_mapping.items():
-            cypher_statements.append(f"\n// Create {node_type} nodes")
+    def _iter_cypher_statements(self):
+        yield "// Neo4j Cypher Script - Knowledge Graph Import"
+        yield f"// Generated at: {datetime.now().isoformat()}"
+        yield "// Clear existing data (optional)"
+        yield "// MATCH (n) DETACH DELETE n;\n"
+        
+        yield "// Create constraints"
+        yield "CREATE CONSTRAINT politician_id IF NOT EXISTS FOR (p:Politician) REQUIRE p.id IS UNIQUE;"
+        yield "CREATE CONSTRAINT position_id IF NOT EXISTS FOR (p:Position) REQUIRE p.id IS UNIQUE;"
+        yield "CREATE CONSTRAINT location_id IF NOT EXISTS FOR (l:Location) REQUIRE l.id IS UNIQUE;"
+        yield "CREATE CONSTRAINT award_id IF NOT EXISTS FOR (a:Award) REQUIRE a.id IS UNIQUE;"
+        yield "CREATE CONSTRAINT military_id IF NOT EXISTS FOR (m:MilitaryCareer) REQUIRE m.id IS UNIQUE;"
+        yield "CREATE CONSTRAINT military_rank_id IF NOT EXISTS FOR (mr:MilitaryRank) REQUIRE mr.id IS UNIQUE;"
+        yield "CREATE CONSTRAINT campaigns_id IF NOT EXISTS FOR (c:Campaigns) REQUIRE c.id IS UNIQUE;"
+        yield "CREATE CONSTRAINT alma_mater_id IF NOT EXISTS FOR (a:AlmaMater) REQUIRE a.id IS UNIQUE;"
+        yield "CREATE CONSTRAINT academic_title_id IF NOT EXISTS FOR (a:AcademicTitle) REQUIRE a.id IS UNIQUE;"
+        
+        for node_type in NODE_TYPES:
+            yield f"\n// Create {node_type} nodes"
             for node in self.nodes[node_type]:
-                props = ', '.join([f"{k}: {json.dumps(v, ensure_ascii=False)}" for k, v in node.items()])
-                cypher_statements.append(f"MERGE (n:{label} {{{props}}});")
-        
-        relationship_configs = [
-            ('SERVED_AS', 'Politician', 'Position', True),
-            ('SUCCEEDED', 'Politician', 'Politician', True),  
-            ('PRECEDED', 'Politician', 'Politician', True),  
-            ('BORN_AT', 'Politician', 'Location', False),
-            ('DIED_AT', 'Politician', 'Location', False),
-            ('AWARDED', 'Politician', 'Award', False),
-            ('SERVED_IN', 'Politician', 'MilitaryCareer', True),
-            ('HAS_RANK', 'Politician', 'MilitaryRank', False),
-            ('FOUGHT_IN', 'Politician', 'Campaigns', False),
-            ('ALUMNUS_OF', 'Politician', 'AlmaMater', False),
-            ('HAS_ACADEMIC_TITLE', 'Politician', 'AcademicTitle', False)
-        ]
-        
-        for rel_type, from_label, to_label, has_props in relationship_configs:
-            cypher_statements.append(f"\n// Create {rel_type} relationships")
-            for edge in self.edges[rel_type]:
-                from_id = json.dumps(edge['from'], ensure_ascii=False)
-                to_id = json.dumps(edge['to'], ensure_ascii=False)
+                yield f"MERGE (n:{node_type} {_cypher_map(node)});"
+        
+        for rel_type, from_label, to_label, has_props in RELATIONSHIP_CONFIGS:
+            yield f"\n// Create {rel_type} relationships"
+            for from_id, to_id, properties in self._iter_edges(rel_type):
+                from_id = _cypher_id(from_id)
+                to_id = _cypher_id(to_id)
                 
-                if has_props and edge.get('properties'):
-                    props = ', '.join([f"{k}: {json.dumps(v, ensure_ascii=False)}" for k, v in edge['properties'].items() if v])
-                    props_str = f" {{{props}}}" if props else ""
+                if has_props and properties:
+                    props = {k: v for k, v in properties.items() if v}
+                    props_str = f" {_cypher_map(props)}" if props else ""
                 else:
                     props_str = ""
                 
-                cypher_statements.append(
+                yield (
                     f"MATCH (a:{from_label} {{id: {from_id}}}), (b:{to_label} {{id: {to_id}}}) "
                     f"MERGE (a)-[:{rel_type}{props_str}]->(b);"
                 )
+    
+    def export_to_neo4j_cypher(self, output_file: str):
+        log.info(f"\nCreating Cypher script: {output_file}")
         
+        statements = self._iter_cypher_statements()
         with open(output_file, 'w', encoding='utf-8') as f:
-            f.write('\n'.join(cypher_statements))
+            f.write(next(statements))
+            f.writelines('\n' + statement for statement in statements)
+        _cypher_id.cache_clear()
         
         log.info(f"Completed!")
 
+def _worker_scrub_shard(shard: List[Dict]) -> Tuple[Dict[str, str], Dict[str, Tuple[str, ...]]]:
+    _TEXT_MEMO.clear()
+    _NAMES_MEMO.clear()
+    builder = KnowledgeGraphBuilder()
+    for politician_data in shard:
+        builder.process_politician(politician_data)
+    return _TEXT_MEMO, _NAMES_MEMO
+
+def _merge_memos(text_memo: Dict[str, str], names_memo: Dict[str, Tuple[str, ...]]):
+    _TEXT_MEMO.update(text_memo)
+    _NAMES_MEMO.update(names_memo)
+
 if __name__ == "__main__":
     builder = KnowledgeGraphBuilder()
     builder.build_from_file(settings.INPUT_GRAPH_POLITICIAN_FILE)
@@ -1,135 +1,192 @@
 # ./graph/export_graph.py
 
 import os
-import json
+import shutil
+import orjson
 from datetime import datetime
-from neo4j import GraphDatabase
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 load_dotenv()
 
+from graph.graph import get_driver
 from utils.config import settings
 from utils._logger import get_logger
 logger = get_logger("graph.export_graph", log_file="logs/graph/export_graph.log")
 
 
+NODE_LABELS = ["Politician", "Position", "Location", "Award", "MilitaryCareer", 
+               "MilitaryRank", "Campaigns", "AlmaMater", "AcademicTitle"]
+
+EDGE_TYPES = ["SERVED_AS", "SUCCEEDED", "PRECEDED", "BORN_AT", "DIED_AT", 
+              "AWARDED", "SERVED_IN", "HAS_RANK", "FOUGHT_IN", "ALUMNUS_OF", 
+              "HAS_ACADEMIC_TITLE"]
+
+# Properties are filtered on the server and shipped as [key, value] pairs, so neither the
+# bookkeeping keys nor the id/name already returned as columns travel over Bolt
+NODE_QUERY = """
+MATCH (n:{label})
+RETURN n.id AS id, n.name AS name, n.type AS type,
+       [k IN keys(n) WHERE NOT k IN $skip | [k, n[k]]] AS props
+"""
+
+EDGE_QUERY = """
+MATCH (a)-[r:{edge_type}]->(b)
+RETURN a.id AS from, b.id AS to, type(r) AS type,
+       [k IN keys(r) WHERE NOT k IN $skip | [k, r[k]]] AS props
+"""
+
+# Bookkeeping properties left out of the exported property maps
+NODE_SKIP_PROPS = ["id", "name", "name_lc", "type", "source", "created_at", "last_updated", "enriched"]
+EDGE_SKIP_PROPS = ["source", "created_at", "type"]
+
+
 class Neo4jGraphExporter:
     def __init__(self):
-        self.driver = GraphDatabase.driver(
-            settings.NEO4J_URI,
-            auth=(settings.NEO4J_USER, settings.NEO4J_PASSWORD)
-        )
+        self.driver = get_driver()
     
     def close(self):
-        if self.driver:
-            self.driver.close()
+        # The driver is shared process-wide (see graph.graph.get_driver) and closed at exit
+        self.driver = None
+    
+    def _export_group(self, output_file: str, key: str, query: str, params: dict, to_dict) -> tuple:
+        """
+        Stream one label / edge type into `<output_file>.<key>.part`; returns (part_file, count).
+        Sessions are not thread-safe, so every call opens its own.
+        """
+        part_file = _part_file(output_file, key)
+        with self.driver.session(database=settings.NEO4J_DATABASE) as session, open(part_file, 'wb') as f:
+            result = session.run(query, params)
+            count = _write_group(f, key, (to_dict(record) for record in result))
+            # Release the connection back to the shared pool before the part file is closed
+            result.consume()
+        return part_file, count
     
-    def export_graph(self, output_file: str = None):
+    def export_graph(self, output_file: str = None, max_workers: int = 8):
         if output_file is None:
             output_file = f"data/processed/graph/knowledge_graph_enriched.json"
         
         os.makedirs(os.path.dirname(output_file), exist_ok=True)
         logger.info(f"Export to {output_file}")
         
-        graph_data = {
-            "metadata": {
-                "created_at": datetime.now().isoformat(),
-                "export_mode": "full_database",
-                "total_nodes": 0,
-                "total_edges": 0,
-                "node_types": [],
-                "edge_types": []
-            },
-            "nodes": {},
-            "edges": {}
+        metadata = {
+            "created_at": datetime.now().isoformat(),
+            "export_mode": "full_database",
+            "total_nodes": 0,
+            "total_edges": 0,
+            "node_types": [],
+            "edge_types": []
         }
         
-        with self.driver.session(database=settings.NEO4J_DATABASE) as session:
-            node_labels = ["Politician", "Position", "Location", "Award", "MilitaryCareer", 
-                          "MilitaryRank", "Campaigns", "AlmaMater", "AcademicTitle"]
-            
-            for label in node_labels:
-                print(f"Exporting {label} nodes...")
-                query = f"""
-                MATCH (n:{label})
-                RETURN n.id AS id, n.name AS name, n.type AS type, properties(n) AS props
-                """
+        # Every label and edge type is exported concurrently, each in its own session and
+        # streamed into its own part file; the parts are then stitched together in the fixed
+        # NODE_LABELS / EDGE_TYPES order. Metadata goes last since the totals are only known then.
+        try:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                node_futures = [
+                    executor.submit(self._export_group, output_file, label, NODE_QUERY.format(label=label),
+                                    {"skip": NODE_SKIP_PROPS}, partial(_node_record_to_dict, label=label))
+                    for label in NODE_LABELS
+                ]
+                edge_futures = [
+                    executor.submit(self._export_group, output_file, edge_type, EDGE_QUERY.format(edge_type=edge_type),
+                                    {"skip": EDGE_SKIP_PROPS}, _edge_record_to_dict)
+                    for edge_type in EDGE_TYPES
+                ]
                 
-                result = session.run(query)
-                
-                nodes_list = []
-                for record in result:
-                    node_data = {
-                        "id": record["id"],
-                        "type": record["type"] or label,
-                        "name": record["name"]
-                    }
-                    
-                    props = record["props"]
-                    filtered_props = {
-                        k: v for k, v in props.items() 
-                        if k not in ["id", "name", "type", "source", "created_at", "last_updated", "enriched"]
-                    }
-                    
-                    if filtered_props:
-                        node_data["properties"] = filtered_props
-                    
-                    nodes_list.append(node_data)
-                
-                if nodes_list:
-                    graph_data["nodes"][label] = nodes_list
-                    graph_data["metadata"]["total_nodes"] += len(nodes_list)
-                    print(f"  → Exported {len(nodes_list)} {label} nodes")
-            
-            edge_types = ["SERVED_AS", "SUCCEEDED", "PRECEDED", "BORN_AT", "DIED_AT", 
-                         "AWARDED", "SERVED_IN", "HAS_RANK", "FOUGHT_IN", "ALUMNUS_OF", 
-                         "HAS_ACADEMIC_TITLE"]
-            
-            for edge_type in edge_types:
-                print(f"Exporting {edge_type} edges...")
-                query = f"""
-                MATCH (a)-[r:{edge_type}]->(b)
-                RETURN a.id AS from, b.id AS to, type(r) AS type, properties(r) AS props
-                """
-                
-                result = session.run(query)
-                
-                edges_list = []
-                for record in result:
-                    edge_data = {
-                        "from": record["from"],
-                        "to": record["to"],
-                        "type": record["type"]
-                    }
-                    
-                    props = record["props"]
-                    filtered_props = {
-                        k: v for k, v in props.items() 
-                        if k not in ["source", "created_at", "type"]
-                    }
-                    
-                    if filtered_props:
-                        edge_data["properties"] = filtered_props
-                    
-                    edges_list.append(edge_data)
-                
-                if edges_list:
-                    graph_data["edges"][edge_type] = edges_list
-                    graph_data["metadata"]["total_edges"] += len(edges_list)
-                    print(f"  → Exported {len(edges_list)} {edge_type} edges")
-        
-        graph_data["metadata"]["node_types"] = list(graph_data["nodes"].keys())
-        graph_data["metadata"]["edge_types"] = list(graph_data["edges"].keys())
-        graph_data["metadata"]["updated_at"] = datetime.now().isoformat()
-        
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(graph_data, f, ensure_ascii=False, indent=2)
+                try:
+                    with open(output_file, 'wb') as f:
+                        f.write(b'{"nodes": {')
+                        metadata["total_nodes"] = _append_parts(f, NODE_LABELS, node_futures, metadata["node_types"], "nodes")
+                        f.write(b'\n},\n"edges": {')
+                        metadata["total_edges"] = _append_parts(f, EDGE_TYPES, edge_futures, metadata["edge_types"], "edges")
+                        
+                        metadata["updated_at"] = datetime.now().isoformat()
+                        f.write(b'\n},\n"metadata": ' + orjson.dumps(metadata, option=orjson.OPT_INDENT_2) + b'}\n')
+                except BaseException:
+                    # Don't start the groups still queued once the export has failed
+                    for future in node_futures + edge_futures:
+                        future.cancel()
+                    raise
+        finally:
+            # Runs after the pool has drained, so no part file is still being written
+            for key in NODE_LABELS + EDGE_TYPES:
+                part_file = _part_file(output_file, key)
+                if os.path.exists(part_file):
+                    os.remove(part_file)
 
         logger.info(f"Export completed: {output_file}")
-        logger.info(f"Total nodes: {graph_data['metadata']['total_nodes']}, Total edges: {graph_data['metadata']['total_edges']}")
+        logger.info(f"Total nodes: {metadata['total_nodes']}, Total edges: {metadata['total_edges']}")
         
         return output_file
 
 
+def _node_record_to_dict(record, label: str) -> dict:
+    node_data = {
+        "id": record["id"],
+        "type": record["type"] or label,
+        "name": record["name"]
+    }
+    
+    props = record["props"]
+    if props:
+        node_data["properties"] = dict(props)
+    
+    return node_data
+
+
+def _edge_record_to_dict(record) -> dict:
+    edge_data = {
+        "from": record["from"],
+        "to": record["to"],
+        "type": record["type"]
+    }
+    
+    props = record["props"]
+    if props:
+        edge_data["properties"] = dict(props)
+    
+    return edge_data
+
+
+def _part_file(output_file: str, key: str) -> str:
+    return f"{output_file}.{key}.part"
+
+
+def _write_group(f, key: str, items) -> int:
+    """
+    Stream one `"key": [...]` member; nothing is written when items is empty.
+    """
+    count = 0
+    for item in items:
+        if count:
+            f.write(b",\n" + orjson.dumps(item))
+        else:
+            f.write(orjson.dumps(key) + b": [\n" + orjson.dumps(item))
+        count += 1
+    if count:
+        f.write(b"\n]")
+    return count
+
+
+def _append_parts(f, keys, futures, found_types: list, kind: str) -> int:
+    """
+    Copy the non-empty part files into f in key order and remove them; returns the total count.
+    """
+    total = 0
+    for key, future in zip(keys, futures):
+        part_file, count = future.result()
+        if count:
+            f.write(b",\n" if found_types else b"\n")
+            with open(part_file, 'rb') as part:
+                shutil.copyfileobj(part, f)
+            found_types.append(key)
+            total += count
+            print(f"  → Exported {count} {key} {kind}")
+        os.remove(part_file)
+    return total
+
+
 if __name__ == "__main__":
     import argparse
     
@@ -154,4 +211,4 @@ if __name__ == "__main__":
         raise
     finally:
         exporter.close()
-        logger.info("Neo4j connection closed")
+        logger.info("Neo4j connection released")
@@ -1,8 +1,12 @@
 # ./graph/graph.py
 
-import json
+import atexit
+import orjson
 
-from neo4j import GraphDatabase
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+
+from neo4j import GraphDatabase, AsyncGraphDatabase
 from utils.config import settings
 from utils.queue_based_async_logger import get_async_logger
 
@@ -15,16 +19,42 @@ Connect to Neo4j and clear database
 def create_neo4j_driver():
     driver = GraphDatabase.driver(
         settings.NEO4J_URI,
-        auth=(settings.NEO4J_USER, settings.NEO4J_PASSWORD)
+        auth=(settings.NEO4J_USER, settings.NEO4J_PASSWORD),
+        max_connection_pool_size=settings.NEO4J_MAX_CONNECTION_POOL_SIZE,
+        connection_acquisition_timeout=settings.NEO4J_CONNECTION_ACQUISITION_TIMEOUT
     )
     return driver
 
+def create_async_neo4j_driver():
+    """
+    Async counterpart of create_neo4j_driver. It is bound to the event loop it is used in,
+    so callers create and close their own instead of sharing it like get_driver().
+    """
+    return AsyncGraphDatabase.driver(
+        settings.NEO4J_URI,
+        auth=(settings.NEO4J_USER, settings.NEO4J_PASSWORD),
+        max_connection_pool_size=settings.NEO4J_MAX_CONNECTION_POOL_SIZE,
+        connection_acquisition_timeout=settings.NEO4J_CONNECTION_ACQUISITION_TIMEOUT
+    )
+
+_driver = None
+
+def get_driver():
+    """
+    Process-wide driver (and connection pool) shared by loaders and exporters; closed at exit.
+    """
+    global _driver
+    if _driver is None:
+        _driver = create_neo4j_driver()
+        atexit.register(_driver.close)
+    return _driver
+
 def close_neo4j_driver(driver):
     driver.close()
 
 def clear_neo4j_database(driver):
     with driver.session(database=settings.NEO4J_DATABASE) as session:
-        session.run("MATCH (n) DETACH DELETE n")
+        session.run("MATCH (n) DETACH DELETE n").consume()
     log.info("Cleared all nodes and relationships.")
 
 
@@ -32,9 +62,75 @@ def clear_neo4j_database(driver):
 """
 Import JSON graph data into Neo4j
 """
-def import_graph_from_json(driver, json_file_path):
-    with open(json_file_path, "r", encoding="utf-8") as f:
-        data = json.load(f)
+IMPORT_BATCH_SIZE = 5000
+
+def _flatten_node_props(node, skip_type):
+    props = {}
+    for k, v in node.items():
+        if k == "type" and skip_type:
+            continue
+        elif k == "properties" and isinstance(v, dict):
+            props.update(v)
+        else:
+            props[k] = v
+    return props
+
+def _node_pattern(var, label, id_expr):
+    if label:
+        return f"{var}:{label} {{id: {id_expr}}}"
+    return f"{var} {{id: {id_expr}}}"
+
+def create_id_indexes(session, labels):
+    for label in labels:
+        session.run(f"CREATE INDEX IF NOT EXISTS FOR (n:{label}) ON (n.id)").consume()
+    # New indexes start out POPULATING; wait so the import queries are planned against them
+    session.run("CALL db.awaitIndexes()").consume()
+
+# Labels and relationship types cannot be parameters, so each combination gets one fixed
+# query text (built once) and every row value goes through $rows; the plan cache then hits
+@lru_cache(maxsize=None)
+def _node_merge_cypher(label):
+    return f"UNWIND $rows AS row MERGE (n:{label} {{id: row.id}}) SET n += row.props"
+
+@lru_cache(maxsize=None)
+def _edge_merge_cypher(rel_type, from_label, to_label):
+    return (
+        f"UNWIND $rows AS row "
+        f"MATCH ({_node_pattern('a', from_label, 'row.from')}), ({_node_pattern('b', to_label, 'row.to')}) "
+        f"MERGE (a)-[r:{rel_type}]->(b) "
+        f"SET r += row.props"
+    )
+
+def _plan_operators(plan):
+    yield plan.get("operatorType", "")
+    for child in plan.get("children", []):
+        yield from _plan_operators(child)
+
+def _log_edge_plan(session, cypher):
+    plan = session.run("EXPLAIN " + cypher, rows=[]).consume().plan or {}
+    operators = sorted(set(_plan_operators(plan)))
+    if any("IndexSeek" in op for op in operators):
+        log.info(f"Edge import plan uses an index seek: {operators}")
+    else:
+        log.warning(f"Edge import plan has no index seek: {operators}")
+
+def _write_batch(tx, cypher, rows):
+    tx.run(cypher, rows=rows).consume()
+
+def _run_batched(session, cypher, rows):
+    # One managed write transaction per batch, retried by the driver on transient errors
+    for start in range(0, len(rows), IMPORT_BATCH_SIZE):
+        session.execute_write(_write_batch, cypher, rows[start:start + IMPORT_BATCH_SIZE])
+    return len(rows)
+
+def _import_label(driver, node_type, rows):
+    # Sessions are not thread-safe, so each label imported from the pool opens its own
+    with driver.session(database=settings.NEO4J_DATABASE) as session:
+        return _run_batched(session, _node_merge_cypher(node_type), rows)
+
+def import_graph_from_json(driver, json_file_path, max_workers=4):
+    with open(json_file_path, "rb") as f:
+        data = orjson.loads(f.read())
 
     if isinstance(data, list):
         log.warning("JSON format is a list")
@@ -66,67 +162,65 @@ def import_graph_from_json(driver, json_file_path):
             })
         edges = converted_edges
 
-    total_nodes = 0
+    nodes_by_label = {}
+    node_labels = {}
+    if isinstance(nodes, dict):
+        for node_type, node_list in nodes.items():
+            rows = nodes_by_label.setdefault(node_type, [])
+            for node in node_list:
+                rows.append({"id": node["id"], "props": _flatten_node_props(node, skip_type=True)})
+                node_labels[node["id"]] = node_type
+    elif isinstance(nodes, list):
+        for node in nodes:
+            node_type = node.get("type", "Unknown")
+            nodes_by_label.setdefault(node_type, []).append(
+                {"id": node["id"], "props": _flatten_node_props(node, skip_type=False)}
+            )
+            node_labels[node["id"]] = node_type
+
+    edges_by_type = {}
+    if isinstance(edges, dict):
+        for rel_type, rel_list in edges.items():
+            edges_by_type.setdefault(rel_type, []).extend(
+                {"from": rel["from"], "to": rel["to"], "props": rel.get("properties", {})}
+                for rel in rel_list
+            )
+    elif isinstance(edges, list):
+        for rel in edges:
+            rel_type = rel.get("type", "RELATED")
+            edges_by_type.setdefault(rel_type, []).append(
+                {"from": rel.get("from"), "to": rel.get("to"), "props": rel.get("properties", {})}
+            )
+
     total_edges = 0
 
+    # One UNWIND query per label / relationship type instead of one round-trip per row
+    with driver.session(database=settings.NEO4J_DATABASE) as session:
+        create_id_indexes(session, nodes_by_label)
+
+    # Labels never touch each other's nodes, so they are merged concurrently; edges stay
+    # sequential since MERGE on a relationship locks both endpoints and could deadlock
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        total_nodes = sum(executor.map(
+            lambda item: _import_label(driver, *item), nodes_by_label.items()
+        ))
+
     with driver.session(database=settings.NEO4J_DATABASE) as session:
-        if isinstance(nodes, dict):
-            for node_type, node_list in nodes.items():
-                for node in node_list:
-                    props = {}
-                    for k, v in node.items():
-                        if k == "type":
-                            continue
-                        elif k == "properties" and isinstance(v, dict):
-                            for pk, pv in v.items():
-                                props[pk] = pv
-                        else:
-                            props[k] = v
-                    
-                    cypher = f"MERGE (n:{node_type} {{id: $id}}) SET n += $props"
-                    session.run(cypher, id=node["id"], props=props)
-                    total_nodes += 1
-        elif isinstance(nodes, list):
-            for node in nodes:
-                node_type = node.get("type", "Unknown")
-                props = {}
-                for k, v in node.items():
-                    if k == "properties" and isinstance(v, dict):
-                        for pk, pv in v.items():
-                            props[pk] = pv
-                    else:
-                        props[k] = v
-                
-                cypher = f"MERGE (n:{node_type} {{id: $id}}) SET n += $props"
-                session.run(cypher, id=node["id"], props=props)
-                total_nodes += 1
-
-        if isinstance(edges, dict):
-            for rel_type, rel_list in edges.items():
-                for rel in rel_list:
-                    from_id = rel["from"]
-                    to_id = rel["to"]
-                    props = rel.get("properties", {})
-                    cypher = (
-                        f"MATCH (a {{id: $from_id}}), (b {{id: $to_id}}) "
-                        f"MERGE (a)-[r:{rel_type}]->(b) "
-                        f"SET r += $props"
-                    )
-                    session.run(cypher, from_id=from_id, to_id=to_id, props=props)
-                    total_edges += 1
-        elif isinstance(edges, list):
-            for rel in edges:
-                rel_type = rel.get("type", "RELATED")
-                from_id = rel.get("from")
-                to_id = rel.get("to")
-                props = rel.get("properties", {})
-                cypher = (
-                    f"MATCH (a {{id: $from_id}}), (b {{id: $to_id}}) "
-                    f"MERGE (a)-[r:{rel_type}]->(b) "
-                    f"SET r += $props"
-                )
-                session.run(cypher, from_id=from_id, to_id=to_id, props=props)
-                total_edges += 1
+        # Endpoints imported from this file are matched by label so the id index is used;
+        # ids not in the file may refer to existing nodes and keep the unlabelled match
+        plan_checked = False
+        for rel_type, rows in edges_by_type.items():
+            rows_by_labels = {}
+            for row in rows:
+                labels = (node_labels.get(row["from"]), node_labels.get(row["to"]))
+                rows_by_labels.setdefault(labels, []).append(row)
+
+            for (from_label, to_label), label_rows in rows_by_labels.items():
+                cypher = _edge_merge_cypher(rel_type, from_label, to_label)
+                if not plan_checked and from_label and to_label:
+                    _log_edge_plan(session, cypher)
+                    plan_checked = True
+                total_edges += _run_batched(session, cypher, label_rows)
 
     log.info(f"Imported {total_nodes} nodes and {total_edges} edges into Neo4j.")
 
@@ -1,14 +1,44 @@
 # graph/load_graph.py
 
-import json
+import sys
+import ijson
+import asyncio
+
+from concurrent.futures import ThreadPoolExecutor
 import networkx as nx
-from neo4j import GraphDatabase
 
+from graph.graph import create_async_neo4j_driver
 from utils.config import settings
 from utils._logger import get_logger
 
 logger = get_logger("graph.load_graph", log_file="logs/graph/load_graph.log")
 
+NODE_QUERY = """
+MATCH (n:`{label}`)
+WHERE n.id IS NOT NULL
+RETURN n.id AS id, n.name AS name, labels(n)[0] AS type, properties(n) AS props
+"""
+
+# db.labels() only covers labelled nodes; the unlabelled ones are loaded as "Unknown"
+UNLABELLED_NODE_QUERY = """
+MATCH (n)
+WHERE n.id IS NOT NULL AND size(labels(n)) = 0
+RETURN n.id AS id, n.name AS name, null AS type, properties(n) AS props
+"""
+
+EDGE_QUERY = """
+MATCH (a)-[r:`{rel_type}`]->(b)
+WHERE a.id IS NOT NULL AND b.id IS NOT NULL
+RETURN a.id AS from, b.id AS to, type(r) AS rel_type, properties(r) AS props
+"""
+
+
+async def _fetch_records(driver, query: str) -> list:
+    # Async sessions are not safe to share between tasks, so each query gets its own
+    async with driver.session(database=settings.NEO4J_DATABASE) as session:
+        result = await session.run(query)
+        return [record async for record in result]
+
 
 class GraphLoader:
 
@@ -20,18 +50,11 @@ class GraphLoader:
             use_neo4j: True = Neo4j, False = JSON
         """
         self.use_neo4j = use_neo4j
-        self.driver = None
-        
-        if use_neo4j:
-            self.driver = GraphDatabase.driver(
-                settings.NEO4J_URI,
-                auth=(settings.NEO4J_USER, settings.NEO4J_PASSWORD)
-            )
     
     def close(self):
-        if self.driver:
-            self.driver.close()
-            logger.info("Neo4j connection closed")
+        # Nothing is held between loads: every Neo4j load opens and closes its own async
+        # driver, since an async driver cannot outlive the event loop it was used on
+        pass
     
     def load_from_neo4j(self, directed: bool = True) -> tuple:
         """
@@ -43,54 +66,64 @@ class GraphLoader:
                 - graph: NetworkX MultiDiGraph/MultiGraph
                 - node_info: Dict containing detailed info of each node
         """
-        if not self.use_neo4j or not self.driver:
-            raise ValueError("Neo4j driver not initialized. Set use_neo4j=True in constructor.")
+        if not self.use_neo4j:
+            raise ValueError("Neo4j loading disabled. Set use_neo4j=True in constructor.")
         
         logger.info("Loading graph from Neo4j...")
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.load_from_neo4j_async(directed=directed))
+        
+        # Called from a running loop (e.g. Jupyter): asyncio.run would refuse, so the load
+        # gets its own loop on a worker thread
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            return executor.submit(asyncio.run, self.load_from_neo4j_async(directed=directed)).result()
+    
+    async def load_from_neo4j_async(self, directed: bool = True) -> tuple:
+        """
+        Async version of load_from_neo4j: one query per label and per relationship type,
+        all in flight at once, so the load takes about as long as the slowest query.
+        """
+        async with create_async_neo4j_driver() as driver:
+            async with driver.session(database=settings.NEO4J_DATABASE) as session:
+                result = await session.run("CALL db.labels() YIELD label RETURN label")
+                labels = [record["label"] async for record in result]
+                result = await session.run("CALL db.relationshipTypes() YIELD relationshipType RETURN relationshipType")
+                rel_types = [record["relationshipType"] async for record in result]
+            
+            node_queries = [NODE_QUERY.format(label=label) for label in labels] + [UNLABELLED_NODE_QUERY]
+            results = await asyncio.gather(
+                *(_fetch_records(driver, query) for query in node_queries),
+                *(_fetch_records(driver, EDGE_QUERY.format(rel_type=rel_type)) for rel_type in rel_types)
+            )
         
         graph = nx.MultiDiGraph() if directed else nx.MultiGraph()
         node_info = {}
         
-        with self.driver.session(database=settings.NEO4J_DATABASE) as session:
-            # Load all nodes with valid IDs
-            node_query = """
-            MATCH (n)
-            WHERE n.id IS NOT NULL
-            RETURN n.id AS id, n.name AS name, labels(n)[0] AS type, properties(n) AS props
-            """
-            result = session.run(node_query)
-            
-            for record in result:
+        # Nodes with several labels come back once per label; the entries are identical
+        for records in results[:len(node_queries)]:
+            for record in records:
                 node_id = record["id"]
                 if not node_id:
                     continue
-                    
-                graph.add_node(node_id)
                 node_info[node_id] = {
                     "name": record["name"] or "",
-                    "type": record["type"] or "Unknown",
+                    "type": sys.intern(record["type"] or "Unknown"),
                     "properties": record["props"] or {}
                 }
-            
-            # Load all edges between valid nodes
-            edge_query = """
-            MATCH (a)-[r]->(b)
-            WHERE a.id IS NOT NULL AND b.id IS NOT NULL
-            RETURN a.id AS from, b.id AS to, type(r) AS rel_type, properties(r) AS props
-            """
-            result = session.run(edge_query)
-            
-            for record in result:
-                from_id = record["from"]
-                to_id = record["to"]
-                
-                if from_id and to_id and from_id in graph and to_id in graph:
-                    graph.add_edge(
-                        from_id,
-                        to_id,
-                        rel_type=record["rel_type"] or "UNKNOWN",
-                        properties=record["props"] or {}
-                    )
+        graph.add_nodes_from(node_info)
+        
+        # Only keep edges between valid nodes
+        edge_tuples = []
+        for records in results[len(node_queries):]:
+            edge_tuples.extend(
+                (record["from"], record["to"],
+                 {"rel_type": sys.intern(record["rel_type"] or "UNKNOWN"), "properties": record["props"] or {}})
+                for record in records
+                if record["from"] in node_info and record["to"] in node_info
+            )
+        graph.add_edges_from(edge_tuples)
         
         logger.info(f"Loaded graph: {graph.number_of_nodes()} nodes, {graph.number_of_edges()} edges")
         return graph, node_info
@@ -108,39 +141,57 @@ class GraphLoader:
         """
         logger.info(f"Loading graph from {json_file}")
         
-        with open(json_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        # Stream one node/edge type at a time instead of parsing the whole document; the
+        # second handle is only read once every node has been loaded
+        with open(json_file, 'rb') as nodes_f, open(json_file, 'rb') as edges_f:
+            return self._load_groups(
+                ijson.kvitems(nodes_f, 'nodes', use_float=True),
+                ijson.kvitems(edges_f, 'edges', use_float=True),
+                directed=directed
+            )
+    
+    def load_from_data(self, data: dict, directed: bool = True) -> tuple:
+        """
+        Args:
+            data: Already parsed knowledge graph JSON ({"nodes": {...}, "edges": {...}})
+            directed: True = MultiDiGraph, False = MultiGraph (undirected)
         
+        Returns:
+            tuple: (graph, node_info)
+        """
+        return self._load_groups(data.get('nodes', {}).items(), data.get('edges', {}).items(), directed=directed)
+    
+    def _load_groups(self, node_groups, edge_groups, directed: bool = True) -> tuple:
+        """
+        Build the graph from (node_type, nodes) and (edge_type, edges) pairs, consumed in that order.
+        """
         graph = nx.MultiDiGraph() if directed else nx.MultiGraph()
         node_info = {}
         
         # Load nodes
-        if 'nodes' in data:
-            for node_type, node_list in data['nodes'].items():
-                for node in node_list:
-                    node_id = node.get('id')
-                    if node_id:
-                        graph.add_node(node_id)
-                        node_info[node_id] = {
-                            "name": node.get('name', ''),
-                            "type": node.get('type', node_type),
-                            "properties": node.get('properties', {})
-                        }
-        
-        # Load edges
-        if 'edges' in data:
-            for edge_type, edge_list in data['edges'].items():
-                for edge in edge_list:
-                    from_id = edge.get('from')
-                    to_id = edge.get('to')
-                    
-                    if from_id and to_id and from_id in graph and to_id in graph:
-                        graph.add_edge(
-                            from_id,
-                            to_id,
-                            rel_type=edge_type,
-                            properties=edge.get('properties', {})
-                        )
+        for node_type, node_list in node_groups:
+            for node in node_list:
+                node_id = node.get('id')
+                if node_id:
+                    node_info[node_id] = {
+                        "name": node.get('name', ''),
+                        # One shared str per type instead of one per node
+                        "type": sys.intern(node.get('type', node_type)),
+                        "properties": node.get('properties', {})
+                    }
+        # node_info keeps first-seen order, so the graph gets the same node order in one call
+        graph.add_nodes_from(node_info)
+        
+        # Load edges; endpoints are checked against node_info (a plain dict) rather than the graph
+        edge_tuples = []
+        for edge_type, edge_list in edge_groups:
+            edge_type = sys.intern(edge_type)
+            edge_tuples.extend(
+                (edge['from'], edge['to'], {"rel_type": edge_type, "properties": edge.get('properties', {})})
+                for edge in edge_list
+                if edge.get('from') in node_info and edge.get('to') in node_info
+            )
+        graph.add_edges_from(edge_tuples)
         
         logger.info(f"Loaded graph: {graph.number_of_nodes()} nodes, {graph.number_of_edges()} edges")
         return graph, node_info
@@ -157,7 +208,8 @@ class GraphLoader:
             **kwargs: Additional args for load methods (directed, etc.)
         
         Returns:
-            tuple: (graph, node_info) - Filtered subgraph
+            tuple: (graph, node_info) - Filtered subgraph. The graph is a read-only view
+                over the full graph; call .copy() on it before mutating.
         """
         # Load full graph
         if source == "neo4j":
@@ -165,22 +217,27 @@ class GraphLoader:
         else:
             graph, node_info = self.load_from_json(source, **kwargs)
         
+        full_graph = graph
+        filter_node = nx.filters.no_filter
+        filter_edge = nx.filters.no_filter
+        
         # Filter nodes by type
         if node_types:
-            nodes_to_keep = [
+            node_types = set(node_types)
+            nodes_to_keep = {
                 node_id for node_id, info in node_info.items()
                 if info.get("type") in node_types
-            ]
-            graph = graph.subgraph(nodes_to_keep).copy()
+            }
+            filter_node = nodes_to_keep.__contains__
             node_info = {k: v for k, v in node_info.items() if k in nodes_to_keep}
         
         # Filter edges by type
         if edge_types:
-            edges_to_remove = [
-                (u, v, k) for u, v, k, data in graph.edges(keys=True, data=True)
-                if data.get("rel_type") not in edge_types
-            ]
-            graph.remove_edges_from(edges_to_remove)
+            edge_types = set(edge_types)
+            filter_edge = lambda u, v, k: full_graph[u][v][k].get("rel_type") in edge_types
+        
+        # Lazy view instead of copying the graph and then removing edges from the copy
+        graph = nx.subgraph_view(full_graph, filter_node=filter_node, filter_edge=filter_edge)
         
         logger.info(f"Filtered graph: {graph.number_of_nodes()} nodes, {graph.number_of_edges()} edges")
         return graph, node_info
@@ -204,6 +261,21 @@ def load_graph_from_neo4j(directed: bool = True) -> tuple:
         loader.close()
 
 
+def load_graph_from_data(data: dict, directed: bool = True) -> tuple:
+    """
+    Load graph from an already parsed knowledge graph JSON
+    
+    Args:
+        data: Parsed JSON ({"nodes": {...}, "edges": {...}})
+        directed: True = MultiDiGraph, False = MultiGraph
+    
+    Returns:
+        tuple: (graph, node_info)
+    """
+    loader = GraphLoader(use_neo4j=False)
+    return loader.load_from_data(data, directed=directed)
+
+
 def load_graph_from_json(json_file: str, directed: bool = True) -> tuple:
     """
     Load graph from JSON
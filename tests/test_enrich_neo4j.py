@@ -0,0 +1,154 @@
+# tests/test_enrich_neo4j.py
+
+import os
+import re
+
+import pytest
+
+for module in ("neo4j", "google.generativeai", "google.api_core", "tqdm", "dotenv", "ijson", "orjson"):
+    pytest.importorskip(module)
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class FakeResult(list):
+
+    def single(self):
+        return self[0] if self else None
+
+    def consume(self):
+        return None
+
+
+class FakeGraph:
+    """
+    Minimal in-memory stand-in for the queries the enrichment writer runs, enforcing the
+    per-label unique id constraint added by ensure_schema.
+    """
+
+    def __init__(self):
+        # label -> id -> properties
+        self.nodes = {}
+        self.edges = []
+
+    def add_node(self, label, node_id, name):
+        self.nodes.setdefault(label, {})[node_id] = {"id": node_id, "name": name, "name_lc": name.lower()}
+
+    def session(self, **kwargs):
+        return FakeSession(self)
+
+    def close(self):
+        pass
+
+    def run(self, query, **params):
+        if "n.name_lc IN $names" in query:
+            label = re.search(r"MATCH \(n:(\w+)\)", query).group(1)
+            return FakeResult(
+                {"name": node["name_lc"], "id": node["id"]}
+                for node in self.nodes.get(label, {}).values() if node["name_lc"] in params["names"]
+            )
+        if "STARTS WITH $prefixes" in query:
+            return FakeResult(
+                {"label": label, "id": node_id}
+                for label, prefix in params["prefixes"].items() if prefix
+                for node_id in self.nodes.get(label, {}) if node_id.startswith(prefix)
+            )
+        if "MERGE (n:" in query:
+            ids = {}
+            for label, rows in params["nodes"].items():
+                label_nodes = self.nodes.setdefault(label, {})
+                ids[label] = []
+                for row in rows:
+                    node = next((n for n in label_nodes.values() if n["name_lc"] == row["props"]["name_lc"]), None)
+                    if node is None:
+                        if row["id"] in label_nodes:
+                            raise RuntimeError(f"Node already exists with label `{label}` and property `id` = '{row['id']}'")
+                        node = label_nodes[row["id"]] = dict(row["props"], id=row["id"])
+                    ids[label].append([node["name_lc"], node["id"]])
+            return FakeResult([{"ids": ids}])
+        if "MERGE (p)-[r:" in query:
+            added = 0
+            for edge_type, rows in params["edges"].items():
+                for row in rows:
+                    self.edges.append((params["pol_id"], edge_type, row["to"]))
+                    added += 1
+            return FakeResult([{"edges_added": added}])
+        return FakeResult()
+
+
+class FakeSession:
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def run(self, query, **params):
+        return self.graph.run(query, **params)
+
+
+class FakeRotator:
+
+    def get_current_key_name(self):
+        return "test"
+
+
+@pytest.fixture
+def enrichment(monkeypatch, tmp_path):
+    # The module reads enrichment/schema.json relative to the working directory on import
+    monkeypatch.chdir(REPO_ROOT)
+    import enrichment.enrich_neo4j as enrich_neo4j
+
+    graph = FakeGraph()
+    monkeypatch.setattr(enrich_neo4j.GraphDatabase, "driver", lambda *args, **kwargs: graph)
+    monkeypatch.setattr(enrich_neo4j, "get_api_key_rotator", FakeRotator)
+    monkeypatch.setattr(enrich_neo4j.genai, "GenerativeModel", lambda **kwargs: None)
+    monkeypatch.chdir(tmp_path)
+
+    enricher = enrich_neo4j.Neo4jEnrichment(use_cache=False)
+    yield enricher, graph
+    enricher.close()
+
+
+def test_generated_id_taken_by_imported_node(enrichment):
+    enricher, graph = enrichment
+    # Imported from the infobox with the id the enrichment would generate for index 1
+    graph.add_node("Position", "pos1_001", "Bí thư Tỉnh ủy")
+    graph.add_node("Politician", "pol1", "Nguyễn Văn A")
+
+    politician = {"id": 1, "title": "Nguyễn Văn A"}
+    extracted = {"positions": [{"name": "Chủ tịch nước"}, {"name": "Bí thư Tỉnh ủy"}]}
+    result = enricher._write_to_neo4j(graph, politician, extracted)
+
+    positions = graph.nodes["Position"]
+    assert positions["pos1_001"]["name"] == "Bí thư Tỉnh ủy"
+    assert positions["pos1_002"]["name"] == "Chủ tịch nước"
+    assert result["resolved"][("Position", "chủ tịch nước")] == "pos1_002"
+    assert [entry["id"] for _, entry in result["new_nodes"]] == ["pos1_002"]
+    assert sorted(graph.edges) == [("pol1", "SERVED_AS", "pos1_001"), ("pol1", "SERVED_AS", "pos1_002")]
+
+
+def test_entity_created_by_concurrent_writer(enrichment, monkeypatch):
+    enricher, graph = enrichment
+    graph.add_node("Politician", "pol2", "Trần Văn B")
+
+    # Another writer commits "Huân chương Lao động" between the name lookup and the MERGE
+    lookup = graph.run
+    def run(query, **params):
+        if "MERGE (n:" in query and "Award" not in graph.nodes:
+            graph.add_node("Award", "awa9_001", "Huân chương Lao động")
+        return lookup(query, **params)
+    monkeypatch.setattr(graph, "run", run)
+
+    politician = {"id": 2, "title": "Trần Văn B"}
+    extracted = {"awards": [{"name": "Huân chương Lao động", "year": "1980"}]}
+    result = enricher._write_to_neo4j(graph, politician, extracted)
+
+    assert list(graph.nodes["Award"]) == ["awa9_001"]
+    assert result["new_nodes"] == []
+    assert result["resolved"][("Award", "huân chương lao động")] == "awa9_001"
+    assert graph.edges == [("pol2", "AWARDED", "awa9_001")]
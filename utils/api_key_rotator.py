@@ -58,6 +58,14 @@ class APIKeyRotator:
             return self.keys[self.current_index][0]
         return "NO_KEY_AVAILABLE"
     
+    def get_current_key(self) -> str:
+        """
+        Return the value of the current key
+        """
+        if self.current_index >= len(self.keys):
+            raise Exception("All API keys have been exhausted!")
+        return self.keys[self.current_index][1]
+    
     def rotate_key(self, reason: str = "quota_exceeded") -> bool:
         current_key_name = self.get_current_key_name()
         self.failed_keys.add(current_key_name)
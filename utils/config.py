@@ -55,6 +55,8 @@ class Settings():
     NEO4J_USER = "neo4j"
     NEO4J_PASSWORD = "12345678"
     NEO4J_DATABASE = "mxh"
+    NEO4J_MAX_CONNECTION_POOL_SIZE = 50
+    NEO4J_CONNECTION_ACQUISITION_TIMEOUT = 60.0
 
     # Embeddings settings
     EMBEDDING_MODEL_NAME = "BAAI/bge-m3"